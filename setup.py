@@ -7,7 +7,7 @@ from setuptools import setup, find_packages
 long_description = open('README.md').read()
 
 DEPENDENCIES = ['numpy==1.17.0', 'pandas==0.24', 'geopandas==0.5.0', 'scipy==1.3.0', 'powerlaw==1.4.4',
-                'tqdm==4.32.1', 'requests==2.22.0', 'scikit-learn==0.21.2', 'statsmodels==0.10.0rc2',
+                'tqdm==4.32.1', 'joblib==0.13.2', 'requests==2.22.0', 'scikit-learn==0.21.2', 'statsmodels==0.10.0rc2',
                 'folium==0.9.1', 'matplotlib==3.1.1', 'geojson==2.4.1', 'shapely==1.7a1', 'fiona==1.8.6']
 
 TEST_DEPENDENCIES = [
@@ -42,6 +42,7 @@ setup(
                  'Programming Language :: Python :: 3.6',
                  'Programming Language :: Python :: 3.7',
                  ],
-    install_requires=DEPENDENCIES
+    install_requires=DEPENDENCIES,
+    extras_require={'numba': ['numba==0.49.0'], 'dask': ['dask[dataframe]==2.1.0']}
     #extra_requires={'geometry_support':'geopandas'}
     )
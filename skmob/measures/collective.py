@@ -2,13 +2,16 @@ import numpy as np
 from scipy import stats
 import pandas as pd
 from datetime import timedelta
-from collections import defaultdict
 from skmob.measures.individual import home_location
 from ..utils import constants
-import sys
+from ..utils.grouping import sorted_arrays, map_groups, mobility_networks
 from tqdm import tqdm
 tqdm.pandas()
-from skmob.utils.gislib import getDistanceByHaversine
+from skmob.utils.gislib import getDistanceByHaversineArray
+
+# names of the columns of the measures
+_RANDOM_LOCATION_ENTROPY = 'random_location_entropy'
+_UNCORRELATED_LOCATION_ENTROPY = 'uncorrelated_location_entropy'
 
 def _random_location_entropy_individual(traj):
     """
@@ -75,15 +78,14 @@ def random_location_entropy(traj, show_progress=True):
     # if 'uid' column in not present in the TrajDataFrame
     if constants.UID not in traj.columns:
         all_locations = traj[[constants.LATITUDE, constants.LONGITUDE]].drop_duplicates([constants.LATITUDE, constants.LONGITUDE])
-        all_locations['random_location_entropy'] = 0.0
+        all_locations[_RANDOM_LOCATION_ENTROPY] = 0.0
         return all_locations
     
     if show_progress:
         df = pd.DataFrame(traj.groupby([constants.LATITUDE, constants.LONGITUDE]).progress_apply(lambda x: _random_location_entropy_individual(x)))
     else:
         df = pd.DataFrame(traj.groupby([constants.LATITUDE, constants.LONGITUDE]).apply(lambda x: _random_location_entropy_individual(x)))
-    column_name = sys._getframe().f_code.co_name
-    return df.reset_index().rename(columns={0: column_name})
+    return df.reset_index().rename(columns={0: _RANDOM_LOCATION_ENTROPY})
 
 def _uncorrelated_location_entropy_individual(traj, normalize=True):
     n = len(traj)
@@ -154,40 +156,36 @@ def uncorrelated_location_entropy(traj, normalize=False, show_progress=True):
     # if 'uid' column in not present in the TrajDataFrame
     if constants.UID not in traj.columns:
         all_locations = traj[[constants.LATITUDE, constants.LONGITUDE]].drop_duplicates([constants.LATITUDE, constants.LONGITUDE])
-        all_locations['uncorrelated_location_entropy'] = 0.0
+        all_locations[_UNCORRELATED_LOCATION_ENTROPY] = 0.0
         return all_locations
     
     if show_progress:
         df = pd.DataFrame(traj.groupby([constants.LATITUDE, constants.LONGITUDE]).progress_apply(lambda x: _uncorrelated_location_entropy_individual(x, normalize=normalize)))
     else:
         df = pd.DataFrame(traj.groupby([constants.LATITUDE, constants.LONGITUDE]).apply(lambda x: _uncorrelated_location_entropy_individual(x, normalize=normalize)))
-    column_name = sys._getframe().f_code.co_name
+    column_name = _UNCORRELATED_LOCATION_ENTROPY
     if normalize:
-        column_name = 'norm_%s' % sys._getframe().f_code.co_name
+        column_name = 'norm_%s' % _UNCORRELATED_LOCATION_ENTROPY
     return df.reset_index().rename(columns={0: column_name})
 
-def _square_displacement(traj, delta_t):
+def _displaced_position(times, delta_t):
     """
-    Compute the square displacement after time `delta_t` of a single individual given their TrajDataFrame.
+    Compute the position of the last point of a single individual within time `delta_t` from their first point.
     
     Parameters
     ----------
-    traj : TrajDataFrame
-        the trajectory of the individual.
+    times : numpy array
+        the sorted datetimes of the individual.
         
-    delta_t : datetime.timedelta
-        the time from the reference position
+    delta_t : numpy timedelta64
+        the time from the reference position.
         
     Returns
     -------
-    float
-        the square displacement of the individual.
+    int
+        the position of the point in `times`.
     """
-    r0 = traj.iloc[0]
-    t = r0[constants.DATETIME] + delta_t
-    rt = traj[traj[constants.DATETIME] <= t].iloc[-1]
-    square_displacement = getDistanceByHaversine((r0.lat, r0.lng), (rt.lat, rt.lng)) ** 2
-    return square_displacement
+    return np.searchsorted(times, times[0] + delta_t, side='right') - 1
 
 
 def mean_square_displacement(traj, days=0, hours=1, minutes=0, show_progress=True):
@@ -222,10 +220,6 @@ def mean_square_displacement(traj, days=0, hours=1, minutes=0, show_progress=Tru
     float
         the mean square displacement.
 
-    Warning
-    -------
-    The input TrajDataFrame must be sorted in ascending order by `datetime`.
-
     Examples
     --------
     >>> import skmob
@@ -242,16 +236,14 @@ def mean_square_displacement(traj, days=0, hours=1, minutes=0, show_progress=Tru
     .. [BHG2006] Brockmann, D., Hufnagel, L. & Geisel, T. (2006) The scaling laws of human travel. Nature 439, 462-465, https://www.nature.com/articles/nature04292
     .. [SKWB2010] Song, C., Koren, T., Wang, P. & Barabasi, A.L. (2010) Modelling the scaling properties of human mobility. Nature Physics 6, 818-823, https://www.nature.com/articles/nphys1760
     """
-    delta_t = timedelta(days=days, hours=hours, minutes=minutes)
-    
-    # if 'uid' column in not present in the TrajDataFrame
-    if constants.UID not in traj.columns:
-        return _square_displacement(traj, delta_t)
+    delta_t = np.timedelta64(timedelta(days=days, hours=hours, minutes=minutes))
+    _, lats_lngs, times, starts, ends = sorted_arrays(traj)
     
-    if show_progress:
-        return traj.groupby(constants.UID).progress_apply(lambda x: _square_displacement(x, delta_t)).mean()
-    else:
-        return traj.groupby(constants.UID).apply(lambda x: _square_displacement(x, delta_t)).mean()
+    # the reference position of each individual is their first point, the position at time `delta_t` the last point within `delta_t`
+    positions = starts + map_groups(lambda x: _displaced_position(x, delta_t), [times], starts, ends, 
+                                     show_progress=show_progress, dtype=np.int64)
+    square_displacements = getDistanceByHaversineArray(lats_lngs[starts], lats_lngs[positions]) ** 2
+    return square_displacements.mean()
 
 
 def visits_per_location(traj):
@@ -408,7 +400,7 @@ def origin_destination_matrix(traj, self_loops=False, show_progress=True):
         the trajectories of the individuals.
     
     show_progress : boolean, optional
-        if True, show a progress bar. The default is True.
+        not used, since the trips of all the individuals are counted at once. The default is True.
     
     self_loops : boolean, optional
         if True, include sel loops. The default is False.
@@ -445,35 +437,7 @@ def origin_destination_matrix(traj, self_loops=False, show_progress=True):
     ----------
     .. [CDLR2011] Calabrese, F., Di Lorenzo, G., Liu, L. & Ratti, C. (2011) Estimating Origin-Destination Flows Using Mobile Phone Location Data. IEEE Pervasive Computing 10(4), 36-44, https://ieeexplore.ieee.org/document/5871578
     """
-    loc2loc2weight = defaultdict(lambda: defaultdict(lambda: 0))
-
-    def _update_od_matrix(traj):
-        lats_lngs = traj[[constants.LATITUDE, constants.LONGITUDE]].values
-
-        i = 1
-        for lat, lng in lats_lngs[1:]:
-            prev = tuple(lats_lngs[i - 1])
-            current = (lat, lng)
-            if prev != current:
-                loc2loc2weight[prev][current] += 1
-            elif self_loops:
-                loc2loc2weight[prev][current] += 1
-            else:
-                pass
-            i += 1
-    
-    # if 'uid' column in not present in the TrajDataFrame
-    if constants.UID not in traj.columns:
-        _update_od_matrix(traj.sort_values(by=constants.DATETIME))
-    else:
-        if show_progress:
-            traj.sort_values(by=constants.DATETIME).groupby(constants.UID).progress_apply(lambda x: _update_od_matrix(x))
-        else:
-            traj.sort_values(by=constants.DATETIME).groupby(constants.UID).apply(lambda x: _update_od_matrix(x))
-    rows = []
-    for loc1, loc2weight in loc2loc2weight.items():
-        for loc2, weight in loc2weight.items():
-            rows.append([loc1[0], loc1[1], loc2[0], loc2[1], weight])
-    return pd.DataFrame(rows, columns=[constants.LATITUDE + '_origin', constants.LONGITUDE + '_origin',
-                                       constants.LATITUDE + '_dest', constants.LONGITUDE + '_dest', 'n_trips'])
-
+    # the points sorted by individual and datetime with an argsort, instead of sorting the whole TrajDataFrame
+    _, lats_lngs, _, starts, ends = sorted_arrays(traj)
+    _, od_matrix = mobility_networks(lats_lngs, starts, ends, self_loops=self_loops, merge=True)
+    return od_matrix
@@ -1,35 +1,187 @@
 from math import sqrt, sin, cos, pi, asin, pow, ceil, log
+import sys
 import numpy as np
-from scipy import stats
 import pandas as pd
-from collections import defaultdict
-import sys
+from functools import wraps
+from inspect import signature
+from itertools import chain
 from tqdm import tqdm
-from skmob.utils.gislib import getDistanceByHaversine
+from skmob.utils.gislib import getDistanceByHaversineArray, getConsecutiveDistancesByHaversine, \
+    getDistanceByEquirectangularArray, earthradius, equirectangularMaxDegrees
 tqdm.pandas()
 from ..utils import constants
+from ..utils.grouping import TrajectoryIndex, precompute, sorted_arrays, map_groups, map_groups_parallel, numba_threads, \
+    apply_parallel, split_consecutive, merge_consecutive, encode_locations, mobility_networks
+try:
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except ImportError:  # numba is optional: the compiled kernels run as plain Python
+    _HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda function: function
+
+
+# names of the columns of the measures
+_RADIUS_OF_GYRATION = 'radius_of_gyration'
+_K_RADIUS_OF_GYRATION = 'k_radius_of_gyration'
+_RANDOM_ENTROPY = 'random_entropy'
+_UNCORRELATED_ENTROPY = 'uncorrelated_entropy'
+_REAL_ENTROPY = 'real_entropy'
+_JUMP_LENGTHS = 'jump_lengths'
+_MAXIMUM_DISTANCE = 'maximum_distance'
+_DISTANCE_STRAIGHT_LINE = 'distance_straight_line'
+_WAITING_TIMES = 'waiting_times'
+_NUMBER_OF_LOCATIONS = 'number_of_locations'
+_MAX_DISTANCE_FROM_HOME = 'max_distance_from_home'
+_NUMBER_OF_VISITS = 'number_of_visits'
+_LOCATION_FREQUENCY = 'location_frequency'
+_RECENCY_RANK = 'recency_rank'
+_FREQUENCY_RANK = 'frequency_rank'
+
+
+def _is_dask_dataframe(traj):
+    # dask is optional: a Dask DataFrame can only be passed if dask.dataframe has been imported
+    dd = sys.modules.get('dask.dataframe')
+    return dd is not None and isinstance(traj, dd.DataFrame)
+
+
+def _measure_partition(function, partition, args, kwargs):
+    # the partitions are indexed by 'uid', as required by `_dask_partitions`
+    partition = partition.reset_index()
+    if len(partition) == 0:
+        return None
+    return function(partition, *args, **kwargs)
+
+
+def _dask_partitions(function):
+    """
+    Let a measure accept a Dask DataFrame, computing the measure on each of its partitions in the Dask scheduler and concatenating the results in memory.
+    
+    The Dask DataFrame must be indexed by 'uid' with known divisions (e.g., with `set_index('uid')`), so that all the points of an individual are in the same partition. Any other input is passed to the measure unchanged.
+    
+    Parameters
+    ----------
+    function : function
+        the measure, taking the trajectories of the individuals as first argument.
+    
+    Returns
+    -------
+    function
+        the measure accepting also a Dask DataFrame.
+    """
+    function_signature = signature(function)
+    
+    @wraps(function)
+    def wrapper(traj, *args, **kwargs):
+        if not _is_dask_dataframe(traj):
+            return function(traj, *args, **kwargs)
+        
+        if traj.index.name != constants.UID or not traj.known_divisions:
+            raise ValueError("the Dask DataFrame must be indexed by '%s' with known divisions, e.g. with set_index('%s')" % (constants.UID, constants.UID))
+        
+        # the partitions are computed concurrently: they do not draw progress bars
+        if 'show_progress' in function_signature.parameters:
+            arguments = function_signature.bind(traj, *args, **kwargs)
+            arguments.arguments['show_progress'] = False
+            args, kwargs = arguments.args[1:], arguments.kwargs
+        
+        import dask
+        results = dask.compute(*[dask.delayed(_measure_partition)(function, partition, args, kwargs) 
+                                 for partition in traj.to_delayed()])
+        results = [result for result in results if result is not None]
+        if len(results) == 0:
+            return function(traj._meta.reset_index(), *args, **kwargs)
+        
+        # merged lists and arrays are concatenated, DataFrames keep their index only if it identifies the individuals
+        if isinstance(results[0], list):
+            return list(chain.from_iterable(results))
+        if isinstance(results[0], np.ndarray):
+            return np.concatenate(results)
+        return pd.concat(results, ignore_index=isinstance(results[0].index, pd.RangeIndex))
+    
+    return wrapper
+
+
 
-def _radius_of_gyration_individual(traj):
+
+# floating-point relaxations letting LLVM vectorize the transcendental functions of the haversine 
+# formula across points; NaN and infinity semantics are preserved
+_FASTMATH = {'afn', 'arcp', 'contract'}
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _haversine(lat1, lng1, lat2, lng2):
+    # Haversine formula on coordinates in radians
+    a = sin((lat2 - lat1) / 2.0) ** 2 + cos(lat1) * cos(lat2) * sin((lng2 - lng1) / 2.0) ** 2
+    return 2.0 * earthradius * asin(sqrt(min(a, 1.0)))
+
+
+@njit(cache=True, parallel=True, fastmath=_FASTMATH)
+def _haversine_vec(lats1, lngs1, lats2, lngs2):
+    # Haversine formula between the points of two arrays of coordinates in radians, pair by pair
+    distances = np.empty(len(lats1))
+    for j in prange(len(distances)):
+        distances[j] = _haversine(lats1[j], lngs1[j], lats2[j], lngs2[j])
+    return distances
+
+
+_EQUIRECTANGULAR_MAX_RADIANS = equirectangularMaxDegrees * pi / 180.0
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _distance(lat1, lng1, lat2, lng2, fast):
+    # with fast, equirectangular approximation of the Haversine formula for close points
+    if fast and abs(lat2 - lat1) <= _EQUIRECTANGULAR_MAX_RADIANS and abs(lng2 - lng1) <= _EQUIRECTANGULAR_MAX_RADIANS:
+        x = (lng2 - lng1) * cos((lat1 + lat2) / 2.0)
+        return earthradius * sqrt(x * x + (lat2 - lat1) ** 2)
+    return _haversine(lat1, lng1, lat2, lng2)
+
+
+@njit(cache=True, parallel=True, fastmath=_FASTMATH)
+def _radius_of_gyration_all(lats, lngs, starts, ends, fast=False):
+    rg = np.empty(len(starts))
+    for i in prange(len(starts)):
+        start, end = starts[i], ends[i]
+        lat_cm, lng_cm = np.mean(lats[start:end]), np.mean(lngs[start:end])
+        sum_squares = 0.0
+        for j in range(start, end):
+            sum_squares += _distance(lats[j], lngs[j], lat_cm, lng_cm, fast) ** 2.0
+        rg[i] = sqrt(sum_squares / (end - start))
+    return rg
+
+
+def _radius_of_gyration_individual(lats_lngs, fast=False):
     """
-    Compute the radius of gyration of a single individual given their TrajDataFrame.
+    Compute the radius of gyration of a single individual given their points.
 
     Parameters
     ----------
-    traj : TrajDataFrame
-        the trajectory of the individual.
+    lats_lngs : numpy array
+        the (latitude, longitude) pairs of the trajectory of the individual.
+    
+    fast : boolean, optional
+        if True, use the equirectangular approximation for the points close to the center of mass. The default is False.
     
     Returns
     -------
     float
         the radius of gyration of the individual.
     """
-    lats_lngs = traj[[constants.LATITUDE, constants.LONGITUDE]].values
     center_of_mass = np.mean(lats_lngs, axis=0)
-    rg = np.sqrt(np.mean([getDistanceByHaversine((lat, lng), center_of_mass) ** 2.0 for lat, lng in lats_lngs]))
+    if fast:
+        distances = getDistanceByEquirectangularArray(lats_lngs, center_of_mass)
+    else:
+        distances = getDistanceByHaversineArray(lats_lngs, center_of_mass)
+    rg = np.sqrt(np.mean(distances ** 2.0))
     return rg
 
 
-def radius_of_gyration(traj, show_progress=True):
+@_dask_partitions
+def radius_of_gyration(traj, show_progress=True, n_jobs=1, fast=False):
     """Radius of gyration.
     
     Compute the radii of gyration (in kilometers) of a set of individuals in a TrajDataFrame.
@@ -48,6 +200,12 @@ def radius_of_gyration(traj, show_progress=True):
     show_progress : boolean, optional
         if True, show a progress bar. The default is True.
     
+    n_jobs : int, optional
+        the number of processes computing the measure in parallel, or the number of threads when numba is installed; -1 means using all processors. TrajDataFrames with fewer than 100000 points are processed sequentially. The default is 1.
+    
+    fast : boolean, optional
+        if True, the distances between points less than one degree of latitude and longitude apart are computed with the equirectangular approximation, which is faster than the haversine formula and differs from it by less than 0.01%. The default is False.
+    
     Returns
     -------
     pandas DataFrame
@@ -79,24 +237,30 @@ def radius_of_gyration(traj, show_progress=True):
     --------
     k_radius_of_gyration
     """
+    index = precompute(traj)
+    uids, lats_lngs, starts, ends = index.uids, index.lats_lngs, index.starts, index.ends
+    
     # if 'uid' column in not present in the TrajDataFrame
-    if constants.UID not in traj.columns:
-        return pd.DataFrame([_radius_of_gyration_individual(traj)], columns=[sys._getframe().f_code.co_name])
+    if uids is None:
+        return pd.DataFrame([_radius_of_gyration_individual(lats_lngs, fast=fast)], columns=[_RADIUS_OF_GYRATION])
     
-    if show_progress:
-        df = traj.groupby(constants.UID).progress_apply(lambda x: _radius_of_gyration_individual(x))
+    if _HAS_NUMBA:
+        lats, lngs = index.radians
+        rg = map_groups_parallel(_radius_of_gyration_all, [lats, lngs], starts, ends, show_progress=show_progress, n_jobs=n_jobs, 
+                                  args=(fast,))
     else:
-        df = traj.groupby(constants.UID).apply(lambda x: _radius_of_gyration_individual(x))
-    return pd.DataFrame(df).reset_index().rename(columns={0: sys._getframe().f_code.co_name}) 
+        rg = map_groups(lambda x: _radius_of_gyration_individual(x, fast=fast), [lats_lngs], starts, ends, show_progress=show_progress, 
+                        n_jobs=n_jobs)
+    return pd.DataFrame({constants.UID: uids, _RADIUS_OF_GYRATION: rg})
 
 
-def _k_radius_of_gyration_individual(traj, k=2):
-    """Compute the k-radius of gyration of a single individual given their TrajDataFrame.
+def _k_radius_of_gyration_individual(lats_lngs, k=2):
+    """Compute the k-radius of gyration of a single individual given their points.
 
     Parameters
     ----------
-    traj : TrajDataFrame
-        the trajectories of the individual.
+    lats_lngs : numpy array
+        the (latitude, longitude) pairs of the time-ordered trajectory of the individual.
     
     k : int, optional
         the number of most frequent locations to consider. The default is 2. The possible range of values is math:`[2, +inf]`.
@@ -106,20 +270,31 @@ def _k_radius_of_gyration_individual(traj, k=2):
     float
         the k-radius of gyration of the individual. 
     """
-    traj['visits'] = traj.groupby([constants.LATITUDE, constants.LONGITUDE]).transform('count')[constants.DATETIME]
-    top_k_locations = traj.drop_duplicates(subset=[constants.LATITUDE, constants.LONGITUDE]).sort_values(by=['visits', constants.DATETIME],
-                                                                              ascending=[False, True])[:k]
-    visits = top_k_locations['visits'].values
-    total_visits = sum(visits)
-    lats_lngs = top_k_locations[[constants.LATITUDE, constants.LONGITUDE]].values
+    # points with a missing coordinate are not a location
+    lats_lngs = lats_lngs[pd.notnull(lats_lngs).all(axis=1)]
+    location_ids = encode_locations(lats_lngs)
+    visits = np.bincount(location_ids)
+    # identifiers are numbered in order of first visit, so a new location starts where the running maximum grows
+    first_points = np.flatnonzero(np.concatenate([[True], location_ids[1:] > np.maximum.accumulate(location_ids)[:-1]]))
+    
+    # the k most visited locations, ties broken by the time of the first visit
+    candidates = np.arange(len(visits))
+    if k < len(visits):
+        min_visits = np.partition(visits, len(visits) - k)[len(visits) - k]
+        candidates = np.flatnonzero(visits >= min_visits)
+    top_k_locations = candidates[np.argsort(-visits[candidates], kind='mergesort')][:k]
+    
+    visits = visits[top_k_locations]
+    total_visits = visits.sum()
+    lats_lngs = lats_lngs[first_points[top_k_locations]]
 
     center_of_mass = visits.dot(lats_lngs) / total_visits
-    krg = np.sqrt(sum([visits[i] * (getDistanceByHaversine((lat, lng), center_of_mass) ** 2.0)
-                       for i, (lat, lng) in enumerate(lats_lngs)]) / total_visits)
+    krg = np.sqrt(visits.dot(getDistanceByHaversineArray(lats_lngs, center_of_mass) ** 2.0) / total_visits)
     return krg
 
 
-def k_radius_of_gyration(traj, k=2, show_progress=True):
+@_dask_partitions
+def k_radius_of_gyration(traj, k=2, show_progress=True, n_jobs=1):
     """k-radius of gyration.
     
     Compute the k-radii of gyration (in kilometers) of a set of individuals in a TrajDataFrame.
@@ -141,6 +316,9 @@ def k_radius_of_gyration(traj, k=2, show_progress=True):
     show_progress : boolean, optional
         if True, show a progress bar. The default is True.
     
+    n_jobs : int, optional
+        the number of processes computing the measure in parallel; -1 means using all processors. TrajDataFrames with fewer than 100000 points are processed sequentially. The default is 1.
+    
     Returns
     -------
     pandas DataFrame
@@ -171,37 +349,37 @@ def k_radius_of_gyration(traj, k=2, show_progress=True):
     --------
     radius_of_gyration
     """
+    uids, lats_lngs, _, starts, ends = sorted_arrays(traj)
+    
     # if 'uid' column in not present in the TrajDataFrame
-    if constants.UID not in traj.columns:
-        return pd.DataFrame([_k_radius_of_gyration_individual(traj, k=k)], columns=['%s%s' % (k, sys._getframe().f_code.co_name)])
+    if uids is None:
+        return pd.DataFrame([_k_radius_of_gyration_individual(lats_lngs, k=k)], columns=['%s%s' % (k, _K_RADIUS_OF_GYRATION)])
     
-    if show_progress:
-        df = traj.groupby(constants.UID).progress_apply(lambda x: _k_radius_of_gyration_individual(x, k))
-    else:
-        df = traj.groupby(constants.UID).apply(lambda x: _k_radius_of_gyration_individual(x, k))
-    return pd.DataFrame(df).reset_index().rename(columns={0: '%s%s' % (k, sys._getframe().f_code.co_name)})
+    krg = map_groups(lambda x: _k_radius_of_gyration_individual(x, k=k), [lats_lngs], starts, ends, show_progress=show_progress, n_jobs=n_jobs)
+    return pd.DataFrame({constants.UID: uids, '%s%s' % (k, _K_RADIUS_OF_GYRATION): krg})
 
 
-def _random_entropy_individual(traj):
+def _random_entropy_individual(locations):
     """
-    Compute the random entropy of a single individual given their TrajDataFrame.
+    Compute the random entropy of a single individual given the locations they visited.
     
     Parameters
     ----------
-    traj : TrajDataFrame
-        the trajectories of the individual
+    locations : numpy array
+        the identifiers of the locations visited by the individual.
     
     Returns
     -------
     float
         the random entropy of the individual 
     """
-    n_distinct_locs = len(traj.groupby([constants.LATITUDE, constants.LONGITUDE]))
+    n_distinct_locs = len(np.unique(locations))
     entropy = np.log2(n_distinct_locs)
     return entropy
 
 
-def random_entropy(traj, show_progress=True):
+@_dask_partitions
+def random_entropy(traj, show_progress=True, n_jobs=1):
     """Random entropy.
     
     Compute the random entropy of a set of individuals in a TrajDataFrame.
@@ -220,6 +398,9 @@ def random_entropy(traj, show_progress=True):
     show_progress : boolean, optional
         if True, show a progress bar. The default is True.
     
+    n_jobs : int, optional
+        the number of processes computing the measure in parallel; -1 means using all processors. TrajDataFrames with fewer than 100000 points are processed sequentially. The default is 1.
+    
     Returns
     -------
     pandas DataFrame
@@ -251,25 +432,25 @@ def random_entropy(traj, show_progress=True):
     --------
     uncorrelated_entropy, real_entropy
     """
+    index = precompute(traj)
+    uids, locations, starts, ends = index.uids, index.location_ids, index.starts, index.ends
+    
     # if 'uid' column in not present in the TrajDataFrame
-    if constants.UID not in traj.columns:
-        return pd.DataFrame([_random_entropy_individual(traj)], columns=[sys._getframe().f_code.co_name])
+    if uids is None:
+        return pd.DataFrame([_random_entropy_individual(locations)], columns=[_RANDOM_ENTROPY])
     
-    if show_progress:
-        df = traj.groupby(constants.UID).progress_apply(lambda x: _random_entropy_individual(x))
-    else:
-        df = traj.groupby(constants.UID).apply(lambda x: _random_entropy_individual(x))
-    return pd.DataFrame(df).reset_index().rename(columns={0: sys._getframe().f_code.co_name})
+    entropies = map_groups(_random_entropy_individual, [locations], starts, ends, show_progress=show_progress, n_jobs=n_jobs)
+    return pd.DataFrame({constants.UID: uids, _RANDOM_ENTROPY: entropies})
 
 
-def _uncorrelated_entropy_individual(traj, normalize=False):
+def _uncorrelated_entropy_individual(locations, normalize=False):
     """
-    Compute the uncorrelated entropy of a single individual given their TrajDataFrame.
+    Compute the uncorrelated entropy of a single individual given the locations they visited.
 
     Parameters
     ----------
-    traj : TrajDataFrame
-        the trajectories of the individuals.
+    locations : numpy array
+        the identifiers of the locations visited by the individual.
     
     normalize : boolean, optional
         if True, normalize the entropy in the range :math:`[0, 1]` by dividing by :math:`log_2(N_u)`, where :math:`N` is the number of distinct locations visited by individual :math:`u`. The default is False.
@@ -279,11 +460,11 @@ def _uncorrelated_entropy_individual(traj, normalize=False):
     float
         the temporal-uncorrelated entropy of the individual
     """
-    n = len(traj)
-    probs = [1.0 * len(group) / n for group in traj.groupby(by=[constants.LATITUDE, constants.LONGITUDE]).groups.values()]
-    entropy = stats.entropy(probs, base=2.0)
+    _, counts = np.unique(locations, return_counts=True)
+    probs = counts / counts.sum()
+    entropy = (probs * np.log2(1.0 / probs)).sum()
     if normalize:
-        n_vals = len(np.unique(traj[[constants.LATITUDE, constants.LONGITUDE]].values, axis=0))
+        n_vals = counts.size
         if n_vals > 1:
             entropy /= np.log2(n_vals)
         else:  # to avoid NaN
@@ -291,7 +472,8 @@ def _uncorrelated_entropy_individual(traj, normalize=False):
     return entropy
 
 
-def uncorrelated_entropy(traj, normalize=False, show_progress=True):
+@_dask_partitions
+def uncorrelated_entropy(traj, normalize=False, show_progress=True, n_jobs=1):
     """Uncorrelated entropy.
     
     Compute the temporal-uncorrelated entropy of a set of individuals in a TrajDataFrame. The temporal-uncorrelated entropy of an individual :math:`u` is defined as [EP2009]_ [SQBB2010]_ [PVGSPG2016]_: 
@@ -312,6 +494,9 @@ def uncorrelated_entropy(traj, normalize=False, show_progress=True):
     show_progress : boolean, optional
         if True, show a progress bar. The default is True.
     
+    n_jobs : int, optional
+        the number of processes computing the measure in parallel; -1 means using all processors. TrajDataFrames with fewer than 100000 points are processed sequentially. The default is 1.
+    
     Returns
     -------
     pandas DataFrame
@@ -342,67 +527,166 @@ def uncorrelated_entropy(traj, normalize=False, show_progress=True):
     --------
     random_entropy, real_entropy
     """
-    column_name = sys._getframe().f_code.co_name
+    column_name = _UNCORRELATED_ENTROPY
     if normalize:
-        column_name = 'norm_%s' % sys._getframe().f_code.co_name
+        column_name = 'norm_%s' % _UNCORRELATED_ENTROPY
+    
+    index = precompute(traj)
+    uids, locations, starts, ends = index.uids, index.location_ids, index.starts, index.ends
     
     # if 'uid' column in not present in the TrajDataFrame
-    if constants.UID not in traj.columns:
-        return pd.DataFrame([_uncorrelated_entropy_individual(traj)], columns=[column_name])
+    if uids is None:
+        return pd.DataFrame([_uncorrelated_entropy_individual(locations)], columns=[column_name])
     
-    if show_progress:
-        df = traj.groupby(constants.UID).progress_apply(lambda x: _uncorrelated_entropy_individual(x, normalize=normalize))
-    else:
-        df = traj.groupby(constants.UID).apply(lambda x: _uncorrelated_entropy_individual(x, normalize=normalize))
-    return pd.DataFrame(df).reset_index().rename(columns={0: column_name})
+    entropies = map_groups(lambda x: _uncorrelated_entropy_individual(x, normalize=normalize), [locations], 
+                            starts, ends, show_progress=show_progress, n_jobs=n_jobs)
+    return pd.DataFrame({constants.UID: uids, column_name: entropies})
 
 
-def _stringify(seq):
-    return '|'.join(['_'.join(list(map(str, r))) for r in seq])
+@njit(cache=True)
+def _find_transition(state, symbol, n_symbols, table_key, table_edge):
+    # open addressing with linear probing over the (state, symbol) keys
+    key = state * n_symbols + symbol
+    mask = len(table_key) - 1
+    slot = (((key ^ (key >> 31)) & 0x7FFFFFFF) * 2654435761) & mask
+    while table_key[slot] != -1:
+        if table_key[slot] == key:
+            return slot
+        slot = (slot + 1) & mask
+    return slot
 
 
+@njit(cache=True)
 def _true_entropy(sequence):
     n = len(sequence)
 
     # these are the first and last elements
     sum_lambda = 1. + 2.
 
+    # symbols numbered from 0 in order of value, so that the (state, symbol) pairs have compact keys
+    order = np.argsort(sequence)
+    symbols = np.empty(n, np.int64)
+    n_symbols = 0
+    for j in range(n):
+        if j > 0 and sequence[order[j]] != sequence[order[j - 1]]:
+            n_symbols = np.int64(n_symbols + 1)
+        symbols[order[j]] = n_symbols
+    n_symbols = np.int64(n_symbols + 1)
+
+    # suffix automaton of sequence[:i], extended by one element at each step; the transitions are 
+    # stored in a hash table, and those of each state also as a linked list of edges to clone them
+    length = np.zeros(2 * n + 1, np.int32)
+    link = np.full(2 * n + 1, -1, np.int32)
+    head = np.full(2 * n + 1, -1, np.int32)
+    edge_symbol = np.empty(4 * n + 4, np.int32)
+    edge_next = np.empty(4 * n + 4, np.int32)
+    table_size = 1
+    while table_size < 8 * n + 8:
+        table_size *= 2
+    table_key = np.full(table_size, -1, np.int64)
+    table_target = np.empty(table_size, np.int32)
+    n_states, n_edges, last = 1, 0, 0
+
+    # state of the automaton and length of the longest subsequence starting at i contained in sequence[:i]
+    state, matched = 0, 0
+
     for i in range(1, n - 1):
-        str_seq = _stringify(sequence[:i])
-        j = 1
-        str_sub_seq = _stringify(sequence[i:i + j])
-        while str_sub_seq in str_seq:
-            j += 1
-            str_sub_seq = _stringify(sequence[i:i + j])
-            if i + j == n:
-                # EOF character
-                j += 1
+        symbol = symbols[i - 1]
+        current = n_states
+        n_states += 1
+        length[current] = length[last] + 1
+        p = last
+        slot = _find_transition(p, symbol, n_symbols, table_key, table_target)
+        while p != -1 and table_key[slot] == -1:
+            table_key[slot], table_target[slot] = p * n_symbols + symbol, current
+            edge_symbol[n_edges], edge_next[n_edges] = symbol, head[p]
+            head[p] = n_edges
+            n_edges += 1
+            p = link[p]
+            if p != -1:
+                slot = _find_transition(p, symbol, n_symbols, table_key, table_target)
+        if p == -1:
+            link[current] = 0
+        else:
+            q = table_target[slot]
+            if length[p] + 1 == length[q]:
+                link[current] = q
+            else:
+                clone = n_states
+                n_states += 1
+                length[clone] = length[p] + 1
+                link[clone] = link[q]
+                edge = head[q]
+                while edge != -1:
+                    target = table_target[_find_transition(q, edge_symbol[edge], n_symbols, table_key, table_target)]
+                    clone_slot = _find_transition(clone, edge_symbol[edge], n_symbols, table_key, table_target)
+                    table_key[clone_slot], table_target[clone_slot] = clone * n_symbols + edge_symbol[edge], target
+                    edge_symbol[n_edges], edge_next[n_edges] = edge_symbol[edge], head[clone]
+                    head[clone] = n_edges
+                    n_edges += 1
+                    edge = edge_next[edge]
+                while p != -1:
+                    slot = _find_transition(p, symbol, n_symbols, table_key, table_target)
+                    if table_key[slot] == -1 or table_target[slot] != q:
+                        break
+                    table_target[slot] = clone
+                    p = link[p]
+                link[q] = clone
+                link[current] = clone
+        last = current
+
+        # the match found at i - 1 without its first element is contained in sequence[:i]
+        while state != 0 and matched <= length[link[state]]:
+            state = link[state]
+
+        # a match reaching the last element is not extended further
+        while matched < n - i - 1:
+            slot = _find_transition(state, symbols[i + matched], n_symbols, table_key, table_target)
+            if table_key[slot] == -1:
                 break
-        sum_lambda += j
+            state = table_target[slot]
+            matched += 1
+
+        if matched == n - i - 1:
+            # EOF character
+            sum_lambda += n - i + 1
+        else:
+            sum_lambda += matched + 1
+
+        if matched > 0:
+            matched -= 1
 
     return 1. / sum_lambda * n * np.log2(n)
 
 
-def _real_entropy_individual(traj):
+@njit(cache=True, parallel=True)
+def _true_entropy_all(sequence, starts, ends):
+    entropies = np.empty(len(starts))
+    for i in prange(len(starts)):
+        entropies[i] = _true_entropy(sequence[starts[i]:ends[i]])
+    return entropies
+
+
+def _real_entropy_individual(lats_lngs):
     """
-    Compute the real entropy of a single individual given their TrajDataFrame.
+    Compute the real entropy of a single individual given their points.
 
     Parameters
     ----------
-    traj : TrajDataFrame
-        the trajectories of the individual.
+    lats_lngs : numpy array
+        the (latitude, longitude) pairs of the time-ordered trajectory of the individual.
     
     Returns
     -------
     float
         the real entropy of the individual.
     """
-    time_series = tuple(map(tuple, traj[[constants.LATITUDE, constants.LONGITUDE]].values))
-    entropy = _true_entropy(time_series)
+    entropy = _true_entropy(encode_locations(lats_lngs))
     return entropy
 
 
-def real_entropy(traj, show_progress=True):
+@_dask_partitions
+def real_entropy(traj, show_progress=True, n_jobs=1):
     """Real entropy.
     
     Compute the real entropy of a set of individuals in a TrajDataFrame. 
@@ -421,15 +705,14 @@ def real_entropy(traj, show_progress=True):
     show_progress : boolean, optional 
         if True, show a progress bar. The default is True.
     
+    n_jobs : int, optional
+        the number of processes computing the measure in parallel, or the number of threads when numba is installed; -1 means using all processors. TrajDataFrames with fewer than 100000 points are processed sequentially. The default is 1.
+    
     Returns
     -------
     pandas DataFrame
         the real entropy of the individuals
     
-    Warning
-    -------
-    The input TrajDataFrame must be sorted in ascending order by `datetime`. Note that the computation of this measure is, by construction, slow.
-    
     Examples
     --------
     >>> import skmob
@@ -451,39 +734,51 @@ def real_entropy(traj, show_progress=True):
     --------
     random_entropy, uncorrelated_entropy
     """
+    index = precompute(traj)
+    uids, lats_lngs, starts, ends = index.uids, index.lats_lngs, index.starts, index.ends
+    
     # if 'uid' column in not present in the TrajDataFrame
-    if constants.UID not in traj.columns:
-        return pd.DataFrame([_real_entropy_individual(traj)], columns=[sys._getframe().f_code.co_name])
+    if uids is None:
+        return pd.DataFrame([_real_entropy_individual(lats_lngs)], columns=[_REAL_ENTROPY])
     
-    if show_progress:
-        df = traj.groupby(constants.UID).progress_apply(lambda x: _real_entropy_individual(x))
-    else:
-        df = traj.groupby(constants.UID).apply(lambda x: _real_entropy_individual(x))
-    return pd.DataFrame(df).reset_index().rename(columns={0: sys._getframe().f_code.co_name})
+    entropies = map_groups_parallel(_true_entropy_all, [index.location_ids], starts, ends, show_progress=show_progress, n_jobs=n_jobs)
+    return pd.DataFrame({constants.UID: uids, _REAL_ENTROPY: entropies})
 
 
-def _jump_lengths_individual(traj):
+@njit(cache=True, parallel=True, fastmath=_FASTMATH)
+def _consecutive_distances(lats, lngs, fast=False):
+    distances = np.empty(max(len(lats) - 1, 0))
+    for j in prange(len(distances)):
+        distances[j] = _distance(lats[j], lngs[j], lats[j + 1], lngs[j + 1], fast)
+    return distances
+
+
+def _jump_lengths_individual(lats_lngs, fast=False):
     """
-    Compute the jump lengths (in kilometers) of a single individual from their TrajDataFrame.
+    Compute the jump lengths (in kilometers) of a single individual from their points.
     
     Parameters
     ----------
-    traj : TrajDataFrame
-        the trajectories of the individual.
+    lats_lngs : numpy array
+        the (latitude, longitude) pairs of the time-ordered trajectory of the individual.
+    
+    fast : boolean, optional
+        if True, use the equirectangular approximation for the jumps between close points. The default is False.
     
     Returns
     -------
-    list
-        the list of distances (in kilometers) traveled by the individual.
+    numpy array
+        the distances (in kilometers) traveled by the individual. If there is just one point, no distance can be computed and the array is empty.
     """
-    if len(traj) == 1:  # if there is just one point, no distance can be computed
-        return []
-    lats_lngs = traj.sort_values(by=constants.DATETIME)[[constants.LATITUDE, constants.LONGITUDE]].values
-    lengths = np.array([getDistanceByHaversine(lats_lngs[i], lats_lngs[i - 1]) for i in range(1, len(lats_lngs))])
+    if fast:
+        lengths = getDistanceByEquirectangularArray(lats_lngs[:-1], lats_lngs[1:])
+    else:
+        lengths = getConsecutiveDistancesByHaversine(lats_lngs)
     return lengths
 
 
-def jump_lengths(traj, show_progress=True, merge=False):
+@_dask_partitions
+def jump_lengths(traj, show_progress=True, merge=False, fast=False, n_jobs=1):
     """Jump lengths.
     
     Compute the jump lengths (in kilometers) of a set of individuals in a TrajDataFrame.
@@ -504,15 +799,17 @@ def jump_lengths(traj, show_progress=True, merge=False):
     merge : boolean, optional
         if True, merge the individuals' lists into one list. The default is False.
     
+    fast : boolean, optional
+        if True, the distances between points less than one degree of latitude and longitude apart are computed with the equirectangular approximation, which is faster than the haversine formula and differs from it by less than 0.01%. The default is False.
+    
+    n_jobs : int, optional
+        the number of threads computing the distances in parallel when numba is installed; -1 means using all processors. TrajDataFrames with fewer than 100000 points are processed sequentially. The default is 1.
+    
     Returns
     -------
     pandas DataFrame or list
         the jump lengths for each individual, where :math:`NaN` indicates that an individual visited just one location and hence distance is not defined; or a list with all jumps together if `merge` is True.
 
-    Warning
-    -------
-    The input TrajDataFrame must be sorted in ascending order by `datetime`. 
-
     Examples
     --------
     >>> import skmob
@@ -541,46 +838,102 @@ def jump_lengths(traj, show_progress=True, merge=False):
     --------
     maximum_distance, distance_straight_line
     """
-    # if 'uid' column in not present in the TrajDataFrame
-    if constants.UID not in traj.columns:
-        return pd.DataFrame(pd.Series([_jump_lengths_individual(traj)]), columns=[sys._getframe().f_code.co_name])
+    index = precompute(traj)
+    uids, lats_lngs, starts, ends = index.uids, index.lats_lngs, index.starts, index.ends
     
-    if show_progress:
-        df = traj.groupby(constants.UID).progress_apply(lambda x: _jump_lengths_individual(x))
+    # if 'uid' column in not present in the TrajDataFrame
+    if uids is None:
+        return pd.DataFrame({_JUMP_LENGTHS: [_jump_lengths_individual(lats_lngs, fast=fast)]})
+    
+    # distances between all consecutive points, in one pass
+    if _HAS_NUMBA:
+        lats, lngs = index.radians
+        with numba_threads(n_jobs, len(lats)):
+            distances = _consecutive_distances(lats, lngs, fast)
     else:
-        df = traj.groupby(constants.UID).apply(lambda x: _jump_lengths_individual(x))
-    
-    df = pd.DataFrame(df).reset_index().rename(columns={0: sys._getframe().f_code.co_name})
+        distances = _jump_lengths_individual(lats_lngs, fast=fast)
     
     if merge:
         # merge all lists 
-        jl_list =[]
-        for x in df.jump_lengths:
-            jl_list.extend(x)
-        return jl_list
-    return df
+        return merge_consecutive(distances, ends).tolist()
+    
+    jumps = split_consecutive(distances, starts, ends, show_progress=show_progress)
+    return pd.DataFrame({constants.UID: uids, _JUMP_LENGTHS: jumps})
 
 
-def _maximum_distance_individual(traj):
+def _trip_stats_individual(lats_lngs):
     """
-    Compute the maximum distance (in kilometers) traveled by an individual given their TrajDataFrame.
+    Compute the maximum distance and the distance straight line (in kilometers) traveled by a single individual given their points.
+    
+    Parameters
+    ----------
+    lats_lngs : numpy array
+        the (latitude, longitude) pairs of the time-ordered trajectory of the individual.
+    
+    Returns
+    -------
+    tuple
+        the maximum traveled distance and the straight line distance traveled by the individual. Note that if the individual visited just one location the maximum distance is :math:`NaN` and the straight line distance is 0.
+    """
+    jumps = _jump_lengths_individual(lats_lngs)
+    if jumps.size > 0:
+        return jumps.max(), jumps.sum()
+    return np.NaN, 0.0
+
+
+@njit(cache=True, parallel=True, fastmath=_FASTMATH)
+def _trip_stats_all(lats, lngs, starts, ends):
+    stats = np.empty((len(starts), 2))
+    for i in prange(len(starts)):
+        max_distance, straight_line = np.NaN, 0.0
+        for j in range(starts[i] + 1, ends[i]):
+            distance = _haversine(lats[j - 1], lngs[j - 1], lats[j], lngs[j])
+            if j == starts[i] + 1 or distance > max_distance:
+                max_distance = distance
+            straight_line += distance
+        stats[i, 0], stats[i, 1] = max_distance, straight_line
+    return stats
+
+
+def _trip_stats(traj, show_progress=True, n_jobs=1):
+    """
+    Compute the maximum distance and the distance straight line (in kilometers) traveled by a set of individuals in a TrajDataFrame, from a single computation of their jump lengths.
     
     Parameters
     ----------
     traj : TrajDataFrame
-        the trajectories of the individual
+        the trajectories of the individuals.
+    
+    show_progress : boolean, optional
+        if True, show a progress bar. The default is True.
+    
+    n_jobs : int, optional
+        the number of processes computing the measure in parallel; -1 means using all processors. TrajDataFrames with fewer than 100000 points are processed sequentially. The default is 1.
     
     Returns
     -------
-    float
-        the maximum traveled distance for the individual. Note that :math:`NaN` indicates that an individual visited just one location and hence distance is not defined.
+    tuple
+        the identifiers of the individuals, their maximum traveled distance and their straight line distance.
     """
-    jumps = _jump_lengths_individual(traj)
-    if len(jumps) > 0:
-        return max(jumps)
-    return np.NaN
+    index = precompute(traj)
+    uids, lats_lngs, starts, ends = index.uids, index.lats_lngs, index.starts, index.ends
+    
+    # if 'uid' column in not present in the TrajDataFrame
+    if uids is None:
+        max_distance, straight_line = _trip_stats_individual(lats_lngs)
+        return None, np.array([max_distance]), np.array([straight_line])
+    
+    if _HAS_NUMBA:
+        lats, lngs = index.radians
+        stats = map_groups_parallel(_trip_stats_all, [lats, lngs], starts, ends, show_progress=show_progress, n_jobs=n_jobs)
+    else:
+        # one row of two values per individual
+        stats = map_groups(_trip_stats_individual, [lats_lngs], starts, ends, show_progress=show_progress, dtype=(float, 2), n_jobs=n_jobs)
+    return uids, stats[:, 0], stats[:, 1]
 
-def maximum_distance(traj, show_progress=True):
+
+@_dask_partitions
+def maximum_distance(traj, show_progress=True, n_jobs=1):
     """Maximum distance.
     
     Compute the maximum distance (in kilometers) traveled by a set of individuals in a TrajDataFrame. The maximum distance :math:`d_{max}` travelled by an individual :math:`u` is defined as: 
@@ -597,6 +950,9 @@ def maximum_distance(traj, show_progress=True):
     show_progress : boolean, optional
         if True, show a progress bar. The default is True.
     
+    n_jobs : int, optional
+        the number of processes computing the measure in parallel, or the number of threads when numba is installed; -1 means using all processors. TrajDataFrames with fewer than 100000 points are processed sequentially. The default is 1.
+    
     Returns
     -------
     pandas DataFrame
@@ -628,36 +984,15 @@ def maximum_distance(traj, show_progress=True):
     --------
     jump_lengths, distance_straight_line
     """
-    # if 'uid' column in not present in the TrajDataFrame
-    if constants.UID not in traj.columns:
-        return pd.DataFrame([_maximum_distance_individual(traj)], columns=[sys._getframe().f_code.co_name])
-    
-    if show_progress:
-        df = traj.groupby(constants.UID).progress_apply(lambda x: _maximum_distance_individual(x))
-    else:
-        df = traj.groupby(constants.UID).apply(lambda x: _maximum_distance_individual(x))
-    return pd.DataFrame(df).reset_index().rename(columns={0: sys._getframe().f_code.co_name})
-
-def _distance_straight_line_individual(traj):
-    """
-    Compute the distance straight line travelled by the individual given their TrajDataFrame.
-    
-    Parameters
-    ----------
-    traj : TrajDataFrame
-        the trajectories of the individual
+    uids, max_distances, _ = _trip_stats(traj, show_progress=show_progress, n_jobs=n_jobs)
     
-    Returns
-    -------
-    float
-        the straight line distance traveled by the individual. Note the :math:`NaN` indicates that the individual visited just one location and hence distance is not defined.
-    """
-    jumps = _jump_lengths_individual(traj)
-    if len(jumps) > 0:
-        return sum(jumps)
-    return 0.0
+    # if 'uid' column in not present in the TrajDataFrame
+    if uids is None:
+        return pd.DataFrame(max_distances, columns=[_MAXIMUM_DISTANCE])
+    return pd.DataFrame({constants.UID: uids, _MAXIMUM_DISTANCE: max_distances})
 
-def distance_straight_line(traj, show_progress=True):
+@_dask_partitions
+def distance_straight_line(traj, show_progress=True, n_jobs=1):
     """Distance straight line.
     
     Compute the distance (in kilometers) travelled straight line by a set of individuals in a TrajDataFrame. The distance straight line :math:`d_{SL}` travelled by an individual :math:`u` is computed as the sum of the distances travelled :math:`u`: 
@@ -674,15 +1009,14 @@ def distance_straight_line(traj, show_progress=True):
     show_progress : boolean, optional 
         if True, show a progress bar. The default is True.
     
+    n_jobs : int, optional
+        the number of processes computing the measure in parallel, or the number of threads when numba is installed; -1 means using all processors. TrajDataFrames with fewer than 100000 points are processed sequentially. The default is 1.
+    
     Returns
     -------
     pandas DataFrame
         the straight line distance traveled by the individuals. Note that :math:`NaN` indicates that an individual visited just one location and hence distance is not defined.
 
-    Warning
-    -------
-    The input TrajDataFrame must be sorted in ascending order by `datetime`.
-
     Examples
     --------
     >>> import skmob
@@ -704,39 +1038,36 @@ def distance_straight_line(traj, show_progress=True):
     --------
     jump_lengths, maximum_distance
     """
-    # if 'uid' column in not present in the TrajDataFrame
-    if constants.UID not in traj.columns:
-        return pd.DataFrame([_distance_straight_line_individual(traj)], columns=[sys._getframe().f_code.co_name])
+    uids, _, straight_lines = _trip_stats(traj, show_progress=show_progress, n_jobs=n_jobs)
     
-    if show_progress:
-        df = traj.groupby(constants.UID).progress_apply(lambda x: _distance_straight_line_individual(x))
-    else:
-        df = traj.groupby(constants.UID).apply(lambda x: _distance_straight_line_individual(x))
-    return pd.DataFrame(df).reset_index().rename(columns={0: sys._getframe().f_code.co_name})
+    # if 'uid' column in not present in the TrajDataFrame
+    if uids is None:
+        return pd.DataFrame(straight_lines, columns=[_DISTANCE_STRAIGHT_LINE])
+    return pd.DataFrame({constants.UID: uids, _DISTANCE_STRAIGHT_LINE: straight_lines})
 
 
-def _waiting_times_individual(traj):
+def _waiting_times_individual(times):
     """
-    Compute the waiting times for a single individual given their TrajDataFrame.
+    Compute the waiting times for a single individual given the datetimes of their points.
     
     Parameters
     ----------
-    traj : TrajDataFrame
-        the trajectories of the individual.
+    times : numpy array
+        the sorted datetimes of the trajectory of the individual.
     
     Returns
     -------
-    list
-        the waiting times of the individual.
+    numpy array
+        the waiting times of the individual. If there is just one point, the array is empty.
     """
-    if len(traj) == 1:
-        return []
-    times = traj.sort_values(by=constants.DATETIME)[constants.DATETIME]
-    wtimes = times.diff()[1:].values.astype('timedelta64[s]').astype('float')
+    # datetimes are int64 nanoseconds: subtract them as integers and truncate to whole seconds
+    nanoseconds = times.astype('datetime64[ns]', copy=False).view(np.int64)
+    wtimes = (np.diff(nanoseconds) // 10**9).astype('float')
     return wtimes
 
 
-def waiting_times(traj, show_progress=True, merge=False):
+@_dask_partitions
+def waiting_times(traj, show_progress=True, merge=False, as_array=False):
     """Waiting times.
     
     Compute the waiting times (in seconds) between the movements of each individual in a TrajDataFrame. A waiting time (or inter-time) by an individual :math:`u` is defined as the time between two consecutive points in :math:`u`'s trajectory:
@@ -756,14 +1087,13 @@ def waiting_times(traj, show_progress=True, merge=False):
     merge : boolean, optional
         if True, merge the individuals' lists into one list. The default is False.
     
-    Returns
-    -------
-    pandas DataFrame or list
-        the list of waiting times for each individual, where :math:`NaN` indicates that an individual visited just one location and hence waiting time is not defined; or a list with all waiting times together if `merge` is True.
+    as_array : boolean, optional
+        if True and `merge` is True, return the merged waiting times as a numpy array instead of a list, avoiding the conversion of each value into a Python float. The default is False.
     
-    Warning
+    Returns
     -------
-    The input TrajDataFrame must by sorted in ascending order by `datetime`.
+    pandas DataFrame, list or numpy array
+        the list of waiting times for each individual, where :math:`NaN` indicates that an individual visited just one location and hence waiting time is not defined; or a list (a numpy array if `as_array` is True) with all waiting times together if `merge` is True.
     
     Examples
     --------
@@ -790,24 +1120,21 @@ def waiting_times(traj, show_progress=True, merge=False):
     .. [SKWB2010] Song, C., Koren, T., Wang, P. & Barabasi, A.L. (2010) Modelling the scaling properties of human mobility. Nature Physics 6, 818-823, https://www.nature.com/articles/nphys1760
     .. [PF2018] Pappalardo, L. & Simini, F. (2018) Data-driven generation of spatio-temporal routines in human mobility. Data Mining and Knowledge Discovery 32, 787-829, https://link.springer.com/article/10.1007/s10618-017-0548-4
     """
-    # if 'uid' column in not present in the TrajDataFrame
-    if constants.UID not in traj.columns:
-        return pd.DataFrame(pd.Series([_waiting_times_individual(traj)]), columns=[sys._getframe().f_code.co_name])
+    uids, _, times, starts, ends = sorted_arrays(traj)
     
-    if show_progress:
-        df = traj.groupby(constants.UID).progress_apply(lambda x: _waiting_times_individual(x))
-    else:
-        df = traj.groupby(constants.UID).apply(lambda x: _waiting_times_individual(x))
+    # if 'uid' column in not present in the TrajDataFrame
+    if uids is None:
+        return pd.DataFrame({_WAITING_TIMES: [_waiting_times_individual(times)]})
     
-    df = pd.DataFrame(df).reset_index().rename(columns={0: sys._getframe().f_code.co_name})
+    # time differences between all consecutive points, in one pass
+    wtimes = _waiting_times_individual(times)
     
     if merge:
-        wl_list =[]
-        for x in df.waiting_times:
-            wl_list.extend(x)
-        return wl_list
+        merged = merge_consecutive(wtimes, ends)
+        return merged if as_array else merged.tolist()
     
-    return df
+    wtimes = split_consecutive(wtimes, starts, ends, show_progress=show_progress)
+    return pd.DataFrame({constants.UID: uids, _WAITING_TIMES: wtimes})
 
 
 def _number_of_locations_individual(traj):
@@ -824,10 +1151,13 @@ def _number_of_locations_individual(traj):
     int
         number of distinct locations visited by the individual.
     """
-    n_locs = len(traj.groupby([constants.LATITUDE, constants.LONGITUDE]).groups)
+    lats_lngs = traj[[constants.LATITUDE, constants.LONGITUDE]].dropna().values
+    # the locations are numbered from 0 in order of first appearance
+    n_locs = encode_locations(lats_lngs).max() + 1 if len(lats_lngs) > 0 else 0
     return n_locs
 
 
+@_dask_partitions
 def number_of_locations(traj, show_progress=True):
     """Number of distinct locations.
     
@@ -839,7 +1169,7 @@ def number_of_locations(traj, show_progress=True):
         the trajectories of the individuals
     
     show_progress : boolean, optional
-        if True, show a progress bar. The default is True.
+        not used, since the locations of all the individuals are counted at once. The default is True.
     
     Returns
     -------
@@ -865,23 +1195,35 @@ def number_of_locations(traj, show_progress=True):
     """
     # if 'uid' column in not present in the TrajDataFrame
     if constants.UID not in traj.columns:
-        return pd.DataFrame([_number_of_locations_individual(traj)], columns=[sys._getframe().f_code.co_name])
+        return pd.DataFrame([_number_of_locations_individual(traj)], columns=[_NUMBER_OF_LOCATIONS])
     
-    if show_progress:
-        df = traj.groupby(constants.UID).progress_apply(lambda x: _number_of_locations_individual(x))
-    else:
-        df = traj.groupby(constants.UID).apply(lambda x: _number_of_locations_individual(x))
-    return pd.DataFrame(df).reset_index().rename(columns={0: sys._getframe().f_code.co_name})
+    index = precompute(traj)
+    uids, lats_lngs, starts, ends = index.uids, index.lats_lngs, index.starts, index.ends
+    if len(uids) == 0:
+        return pd.DataFrame({constants.UID: uids, _NUMBER_OF_LOCATIONS: np.array([], dtype=np.int64)})
+    
+    # each (individual, location) pair as a single int64 key, counted at its first visit
+    locations = index.location_ids
+    individuals = np.repeat(np.arange(len(starts), dtype=np.int64), ends - starts)
+    pairs = individuals * (locations.max() + 1) + locations
+    first_visits = ~pd.Series(pairs).duplicated().values
+    # points with a missing coordinate are not a location
+    first_visits &= pd.notnull(lats_lngs).all(axis=1)
+    n_locs = np.add.reduceat(first_visits.astype(np.int64), starts)
+    return pd.DataFrame({constants.UID: uids, _NUMBER_OF_LOCATIONS: n_locs})
 
 
-def _home_location_individual(traj, start_night='22:00', end_night='07:00'):
+def _sorted_night_visits(traj, order, start_night='22:00', end_night='07:00'):
     """
-    Compute the home location of a single individual given their TrajDataFrame.
+    Find the night visits of a TrajDataFrame, in the order of the arrays of its `TrajectoryIndex`.
     
     Parameters
     ----------
     traj : TrajDataFrame
-        the trajectory of the individual.
+        the trajectories of the individuals.
+    
+    order : numpy array
+        the positions in the TrajDataFrame of the sorted points, as in `TrajectoryIndex.order`.
     
     start_night : str, optional
         the starting time of the night (format HH:MM). The default is '22:00'.
@@ -891,18 +1233,59 @@ def _home_location_individual(traj, start_night='22:00', end_night='07:00'):
     
     Returns
     -------
-    tuple
-        the latitude and longitude coordinates of the individual's home location 
+    numpy array
+        True for the points in the sorted arrays visited during nighttime.
     """
-    night_visits = traj.set_index(pd.DatetimeIndex(traj.datetime)).between_time(start_night, end_night)
-    if len(night_visits) != 0:
-        lat, lng = night_visits.groupby([constants.LATITUDE, constants.LONGITUDE]).count().sort_values(by=constants.DATETIME, ascending=False).iloc[0].name
-    else:
-        lat, lng = traj.groupby([constants.LATITUDE, constants.LONGITUDE]).count().sort_values(by=constants.DATETIME, ascending=False).iloc[0].name
-    home_coords = (lat, lng)
-    return home_coords
+    # the times of the day are read from the datetime column, in its own time zone
+    night = np.zeros(len(traj), dtype=bool)
+    night[pd.DatetimeIndex(traj[constants.DATETIME]).indexer_between_time(start_night, end_night)] = True
+    return night[order]
 
 
+def _home_locations(lats_lngs, night, starts, ends):
+    """
+    Compute the home locations of a set of individuals given the arrays returned by `sorted_arrays`.
+    
+    Parameters
+    ----------
+    lats_lngs : numpy array
+        the (latitude, longitude) pairs sorted by individual and datetime.
+    
+    night : numpy array
+        True for the points visited during nighttime, as returned by `_sorted_night_visits`.
+    
+    starts, ends : numpy array
+        the start and end positions of the slice of each individual.
+    
+    Returns
+    -------
+    numpy array
+        the (latitude, longitude) pair of the home location of each individual, i.e., their location most visited at night, or overall if they are never observed at night. Ties go to the location visited first. The pair is NaN for the individuals without any location.
+    """
+    homes = np.full((len(starts), 2), np.nan)
+    individuals = np.repeat(np.arange(len(starts), dtype=np.int64), ends - starts)
+    
+    # the night visits, or all the visits of the individuals never observed at night
+    has_night = np.bincount(individuals[night], minlength=len(starts)) > 0
+    visits = np.flatnonzero((night | ~has_night[individuals]) & pd.notnull(lats_lngs).all(axis=1))
+    if len(visits) == 0:
+        return homes
+    
+    # each (individual, location) pair as a single int64 key, numbered in order of first visit
+    locations = encode_locations(lats_lngs[visits])
+    pairs, _ = pd.factorize(individuals[visits] * (locations.max() + 1) + locations)
+    n_visits = np.bincount(pairs)
+    first_visits = np.unique(pairs, return_index=True)[1]
+    pair_individuals = individuals[visits[first_visits]]
+    
+    # the most visited pair of each individual, the stable sort keeping the first visited among ties
+    order = np.lexsort((-n_visits, pair_individuals))
+    most_visited = order[np.concatenate([[True], pair_individuals[order][1:] != pair_individuals[order][:-1]])]
+    homes[pair_individuals[most_visited]] = lats_lngs[visits[first_visits[most_visited]]]
+    return homes
+
+
+@_dask_partitions
 def home_location(traj, start_night='22:00', end_night='07:00', show_progress=True):
     """Home location.
     
@@ -925,7 +1308,7 @@ def home_location(traj, start_night='22:00', end_night='07:00', show_progress=Tr
         the ending time for the night (format HH:MM). The default is '07:00'.
     
     show_progress : boolean, optional
-        if True, show a progress bar. The default is True.
+        not used, since the home locations of all the individuals are computed at once. The default is True.
     
     Returns
     -------
@@ -958,45 +1341,19 @@ def home_location(traj, start_night='22:00', end_night='07:00', show_progress=Tr
     --------
     max_distance_from_home
     """
-    # if 'uid' column in not present in the TrajDataFrame
-    if constants.UID not in traj.columns:
-        return pd.DataFrame([_home_location_individual(traj, start_night=start_night, end_night=end_night)], columns=[constants.LATITUDE, constants.LONGITUDE])
-    
-    if show_progress:
-        df = traj.groupby(constants.UID).progress_apply(lambda x: _home_location_individual(x, start_night=start_night, end_night=end_night))
-    else:
-        df = traj.groupby(constants.UID).apply(lambda x: _home_location_individual(x, start_night=start_night, end_night=end_night))
-    return df.apply(pd.Series).reset_index().rename(columns={0: constants.LATITUDE, 1: constants.LONGITUDE})
-
-
-def _max_distance_from_home_individual(traj, start_night='22:00', end_night='07:00'):
-    """
-    Compute the maximum distance from home traveled by a single individual, given their TrajDataFrame.
-
-    Parameters
-    ----------
-    traj : TrajDataFrame
-        the trajectory of the individual.
+    index = precompute(traj)
+    uids, lats_lngs, starts, ends = index.uids, index.lats_lngs, index.starts, index.ends
+    homes = _home_locations(lats_lngs, _sorted_night_visits(traj, index.order, start_night, end_night), starts, ends)
     
-    start_night : str, optional
-        the starting time of the night (format HH:MM). The default is '22:00'.
-        
-    end_night : str, optional
-        the ending time for the night (format HH:MM). The default is '07:00'.
-    
-    Returns
-    -------
-    float
-        the maximum distance from home traveled by the individual.
-    """    
-    lats_lngs = traj.sort_values(by=constants.DATETIME)[[constants.LATITUDE, constants.LONGITUDE]].values
-    home = home_location(traj, start_night=start_night, end_night=end_night, show_progress=False).iloc[0]
-    home_lat, home_lng = home[constants.LATITUDE], home[constants.LONGITUDE]
-    lengths = np.array([getDistanceByHaversine((lat, lng), (home_lat, home_lng)) for i, (lat, lng) in enumerate(lats_lngs)])
-    return lengths.max()
+    df = pd.DataFrame(homes, columns=[constants.LATITUDE, constants.LONGITUDE])
+    # if 'uid' column in not present in the TrajDataFrame
+    if uids is not None:
+        df.insert(0, constants.UID, uids)
+    return df
 
 
-def max_distance_from_home(traj, start_night='22:00', end_night='07:00', show_progress=True):
+@_dask_partitions
+def max_distance_from_home(traj, start_night='22:00', end_night='07:00', show_progress=True, n_jobs=1):
     """Maximum distance from home.
     
     Compute the maximum distance (in kilometers) traveled from their home location by a set of individuals in a TrajDataFrame. The maximum distance from home :math:`dh_{max}(u)` of an individual :math:`u` is defined as [CM2015]_:
@@ -1018,7 +1375,10 @@ def max_distance_from_home(traj, start_night='22:00', end_night='07:00', show_pr
         the ending time for the night (format HH:MM). The default is '07:00'.
     
     show_progress : boolean, optional
-        if True, show a progress bar. The default is True.
+        not used, since the home locations of all the individuals are computed at once. The default is True.
+    
+    n_jobs : int, optional
+        the number of threads computing the distances in parallel when numba is installed; -1 means using all processors. TrajDataFrames with fewer than 100000 points are processed sequentially. The default is 1.
     
     Returns
     -------
@@ -1050,19 +1410,31 @@ def max_distance_from_home(traj, start_night='22:00', end_night='07:00', show_pr
     --------
     maximum_distance, home_location
     """
-    # if 'uid' column in not present in the TrajDataFrame
-    if constants.UID not in traj.columns:
-        return pd.DataFrame([_max_distance_from_home_individual(traj, 
-                                                                start_night=start_night, 
-                                                                end_night=end_night)], columns=[sys._getframe().f_code.co_name])
-    
-    if show_progress:
-        df = traj.groupby(constants.UID).progress_apply(lambda x: _max_distance_from_home_individual(x, start_night=start_night, end_night=end_night))
+    index = precompute(traj)
+    uids, lats_lngs, starts, ends = index.uids, index.lats_lngs, index.starts, index.ends
+    
+    # the home location of each individual is computed once, in the order of the sorted arrays
+    homes = _home_locations(lats_lngs, _sorted_night_visits(traj, index.order, start_night, end_night), starts, ends)
+    if len(starts) == 0:
+        return pd.DataFrame({constants.UID: uids, _MAX_DISTANCE_FROM_HOME: np.array([], dtype=float)})
+    
+    # distances of all the points from the home location of their individual, in one pass
+    homes = np.repeat(homes, ends - starts, axis=0)
+    if _HAS_NUMBA:
+        lats, lngs = index.radians
+        home_lats, home_lngs = np.radians(homes.T, order='C')
+        with numba_threads(n_jobs, len(lats)):
+            distances = _haversine_vec(lats, lngs, home_lats, home_lngs)
     else:
-        df = traj.groupby(constants.UID).apply(lambda x: _max_distance_from_home_individual(x, start_night=start_night, end_night=end_night))
-    return pd.DataFrame(df).reset_index().rename(columns={0: sys._getframe().f_code.co_name})
+        distances = getDistanceByHaversineArray(lats_lngs, homes)
+    max_distances = np.maximum.reduceat(distances, starts)
+    
+    if uids is None:
+        return pd.DataFrame(max_distances, columns=[_MAX_DISTANCE_FROM_HOME])
+    return pd.DataFrame({constants.UID: uids, _MAX_DISTANCE_FROM_HOME: max_distances})
 
 
+@_dask_partitions
 def number_of_visits(traj, show_progress=True):
     """Number of visits.
     
@@ -1074,7 +1446,7 @@ def number_of_visits(traj, show_progress=True):
         the trajectories of the individuals.
     
     show_progress : boolean, optional
-        if True, show a progress bar. The default is True.
+        not used, since the points of all the individuals are counted at once. The default is True.
     
     Returns
     -------
@@ -1102,11 +1474,8 @@ def number_of_visits(traj, show_progress=True):
     if constants.UID not in traj.columns:
         return len(traj)
     
-    if show_progress:
-        df = traj.groupby(constants.UID).progress_apply(lambda x: len(x))
-    else:
-        df = traj.groupby(constants.UID).apply(lambda x: len(x))
-    return pd.DataFrame(df).reset_index().rename(columns={0: sys._getframe().f_code.co_name})
+    df = traj.groupby(constants.UID).size()
+    return pd.DataFrame({constants.UID: df.index.values, _NUMBER_OF_VISITS: df.values})
 
 
 def _location_frequency_individual(traj, normalize=True,
@@ -1137,7 +1506,7 @@ def _location_frequency_individual(traj, normalize=True,
 
 
 def location_frequency(traj, normalize=True, as_ranks=False, show_progress=True,
-                       location_columns=[constants.LATITUDE, constants.LONGITUDE]):
+                       location_columns=[constants.LATITUDE, constants.LONGITUDE], n_jobs=1):
     """Location frequency.
     
     Compute the visitation frequency of each location, for a set of individuals in a TrajDataFrame. Given an individual :math:`u`, the visitation frequency of a location :math:`r_i` is the number of visits to that location by :math:`u`. The visitation frequency :math:`f(r_i)` of location :math:`r_i` is also defined in the literaure as the probability of visiting location :math:`r_i` by :math:`u` [SKWB2010]_ [PF2018]_:
@@ -1164,6 +1533,9 @@ def location_frequency(traj, normalize=True, as_ranks=False, show_progress=True,
     location_columns : list, optional
         the name of the column(s) indicating the location. The default is [constants.LATITUDE, constants.LONGITUDE].
     
+    n_jobs : int, optional
+        the number of processes computing the measure in parallel; -1 means using all processors. TrajDataFrames with fewer than 100000 points are processed sequentially. The default is 1.
+    
     Returns
     -------
     pandas DataFrame or list
@@ -1201,79 +1573,31 @@ def location_frequency(traj, normalize=True, as_ranks=False, show_progress=True,
     --------
     visits_per_location
     """
-    # TrajDataFrame without 'uid' column
-    if constants.UID not in traj.columns: 
-        df = pd.DataFrame(_location_frequency_individual(traj, location_columns=location_columns))
-        return df.reset_index()
-    
-    # TrajDataFrame with a single user
-    n_users = len(traj[constants.UID].unique())
-    if n_users == 1: # if there is only one user in the TrajDataFrame
+    # TrajDataFrame without 'uid' column, or with a single user: compared with the first user, without hashing the users
+    if constants.UID not in traj.columns or \
+            (len(traj) > 0 and (traj[constants.UID].values == traj[constants.UID].values[0]).all()):
         df = pd.DataFrame(_location_frequency_individual(traj, location_columns=location_columns))
         return df.reset_index()
     
     # TrajDataFrame with multiple users
-    if show_progress:
-        df = pd.DataFrame(traj.groupby(constants.UID)
-                          .progress_apply(lambda x: _location_frequency_individual(x, normalize=normalize, location_columns=location_columns)))
-    else:
-        df = pd.DataFrame(traj.groupby(constants.UID)
-                          .apply(lambda x: _location_frequency_individual(x, normalize=normalize, location_columns=location_columns)))
+    # the frequencies of each individual as a DataFrame, so that they are always concatenated, even
+    # when the individuals of a shard have the same locations
+    df = apply_parallel(traj, lambda x: _location_frequency_individual(x, normalize=normalize, location_columns=location_columns).to_frame(), 
+                         show_progress=show_progress, n_jobs=n_jobs)
     
-    df = df.rename(columns={constants.DATETIME: 'location_frequency'})
+    df = df.rename(columns={constants.DATETIME: _LOCATION_FREQUENCY})
     
     if as_ranks:
-        ranks = [[] for i in range(df.groupby('uid').count().max().location_frequency)]
-        for i, group in df.groupby('uid'):
-            for j, (index, row) in enumerate(group.iterrows()):
-                ranks[j].append(row.location_frequency)
-        ranks = [np.mean(rr) for rr in ranks]
-        return ranks
+        # the locations of each individual are sorted by frequency: average the frequencies by position
+        ranks = df.groupby(level=constants.UID).cumcount().values
+        return df[_LOCATION_FREQUENCY].groupby(ranks).mean().tolist()
     
     return df
 
 
-def _individual_mobility_network_individual(traj, self_loops=False):
-    """
-    Compute the individual mobility network of a single individual given their TrajDataFrame.
-    
-    Parameters
-    -----------
-    traj : TrajDataFrame
-        the trajectory of the individual.
-    
-    self_loops : boolean, optional
-        if True adds self loops also. The default is False.
-    
-    Returns
-    -------
-    pandas DataFrame
-        the individual mobility network of the individual.
-    """
-    loc2loc2weight = defaultdict(lambda: defaultdict(lambda: 0))
-    traj = traj.sort_values(by=constants.DATETIME)
-    lats_lngs = traj[[constants.LATITUDE, constants.LONGITUDE]].values
-
-    i = 1
-    for lat, lng in lats_lngs[1:]:
-        prev = tuple(lats_lngs[i - 1])
-        current = (lat, lng)
-        if prev != current:
-            loc2loc2weight[prev][current] += 1
-        elif self_loops:
-            loc2loc2weight[prev][current] += 1
-        else:
-            pass
-        i += 1
-
-    rows = []
-    for loc1, loc2weight in loc2loc2weight.items():
-        for loc2, weight in loc2weight.items():
-            rows.append([loc1[0], loc1[1], loc2[0], loc2[1], weight])
-    return pd.DataFrame(rows, columns=[constants.LATITUDE + '_origin', constants.LONGITUDE + '_origin',
-                                       constants.LATITUDE + '_dest', constants.LONGITUDE + '_dest', 'n_trips'])
 
 
+@_dask_partitions
 def individual_mobility_network(traj, self_loops=False, show_progress=True):
     """Individual Mobility Network.
     
@@ -1293,17 +1617,13 @@ def individual_mobility_network(traj, self_loops=False, show_progress=True):
         if True, adds self loops also. The default is False.
     
     show_progress : boolean, optional
-        if True, show a progress bar. The default is True.
+        not used, since the mobility networks of all the individuals are computed at once. The default is True.
     
     Returns
     -------
     pandas DataFrame
         the individual mobility network of each individual.
 
-    Warning
-    -------
-    The input TrajDataFrame must be sorted in ascending order by `datetime`.
-
     Examples
     --------
     >>> import skmob
@@ -1326,39 +1646,125 @@ def individual_mobility_network(traj, self_loops=False, show_progress=True):
     .. [RGNPPG2014] Rinzivillo, S., Gabrielli, L., Nanni, M., Pappalardo, L., Pedreschi, D. & Giannotti, F. (2012) The purpose of motion: Learning activities from Individual Mobility Networks. Proceedings of the 2014 IEEE International Conference on Data Science and Advanced Analytics, 312-318, https://ieeexplore.ieee.org/document/7058090
     .. [BL2012] Bagrow, J. P. & Lin, Y.-R. (2012) Mesoscopic Structure and Social Aspects of Human Mobility. PLOS ONE 7(5): e37676. https://doi.org/10.1371/journal.pone.0037676
     """
+    uids, lats_lngs, _, starts, ends = sorted_arrays(traj)
+    
     # if 'uid' column in not present in the TrajDataFrame
-    if constants.UID not in traj.columns:
-        return _individual_mobility_network_individual(traj)
+    if uids is None:
+        _, imn = mobility_networks(lats_lngs, starts, ends)
+        return imn
     
-    if show_progress:
-        return traj.groupby(constants.UID).progress_apply(lambda x: _individual_mobility_network_individual(x,
-                self_loops=self_loops)).reset_index().drop('level_1', axis=1)
-    else:
-        return traj.groupby(constants.UID).apply(lambda x: _individual_mobility_network_individual(x,
-                self_loops=self_loops)).reset_index().drop('level_1', axis=1)
+    individuals, imn = mobility_networks(lats_lngs, starts, ends, self_loops=self_loops)
+    imn.insert(0, constants.UID, uids[individuals])
+    return imn
 
 
-def _recency_rank_individual(traj):
+def _descending_ranks(individuals, values):
     """
-    Compute the recency rank of the locations of an individual given their TrajDataFrame.
+    Rank in descending order the values of each individual, ties being ranked in order of appearance.
+    
+    Parameters
+    ----------
+    individuals : numpy array
+        the integer code of the individual of each value, in non-decreasing order.
+    
+    values : numpy array
+        the int64 values to rank.
+    
+    Returns
+    -------
+    numpy array
+        the rank of each value among the values of its individual, starting from 1.
+    """
+    # ~values reverses the order of the values without overflowing, so that the (stable) lexsort 
+    # sorts them in descending order within each individual
+    order = np.lexsort((~values, individuals))
+    starts = np.searchsorted(individuals, individuals, side='left')
+    ranks = np.empty(len(values), dtype=np.int64)
+    ranks[order] = np.arange(1, len(values) + 1) - starts
+    return ranks
+
 
+@_dask_partitions
+def ranks(traj):
+    """Frequency and recency ranks.
+    
+    Compute both the frequency rank and the recency rank of the locations of a set of individuals in a TrajDataFrame, grouping the points by location only once.
+    
     Parameters
     ----------
     traj : TrajDataFrame
-        the trajectory of the individual.
+        the trajectories of the individuals.
     
     Returns
     -------
     pandas DataFrame
-        the recency rank for each location of the individual.
+        the frequency rank and the recency rank of each location of the individuals.
+    
+    Examples
+    --------
+    >>> import skmob
+    >>> from skmob.measures.individual import ranks
+    >>> url = "https://snap.stanford.edu/data/loc-brightkite_totalCheckins.txt.gz"
+    >>> df = pd.read_csv(url, sep='\\t', header=0, nrows=100000, 
+                 names=['user', 'check-in_time', 'latitude', 'longitude', 'location id'])
+    >>> tdf = skmob.TrajDataFrame(df, latitude='latitude', longitude='longitude', datetime='check-in_time', user_id='user')
+    >>> ranks_df = ranks(tdf)
+    >>> frequency_rank_df = ranks_df.drop(columns='recency_rank')
+    >>> recency_rank_df = ranks_df.drop(columns='frequency_rank')
+    
+    See Also
+    --------
+    frequency_rank, recency_rank
     """
-    traj = traj.sort_values(constants.DATETIME, ascending=False).drop_duplicates(subset=[constants.LATITUDE,
-                                                                                         constants.LONGITUDE],
-                                                                                 keep="first")
-    traj['recency_rank'] = range(1, len(traj) + 1)
-    return traj[[constants.LATITUDE, constants.LONGITUDE, 'recency_rank']]
+    # if 'uid' column in not present in the TrajDataFrame
+    keys = [constants.UID] if constants.UID in traj.columns else []
+    keys += [constants.LATITUDE, constants.LONGITUDE]
+    
+    # the number of visits and the time of the last visit of each location, sorted by individual; 
+    # both reductions share the grouping of the points
+    locations = traj.groupby(keys)[constants.DATETIME]
+    counts = locations.count()
+    last_visits = locations.max()
+    if constants.UID in traj.columns:
+        individuals = counts.index.codes[0].astype(np.int64)
+    else:
+        individuals = np.zeros(len(counts), dtype=np.int64)
+    
+    df = counts.index.to_frame(index=False)
+    df[_FREQUENCY_RANK] = _descending_ranks(individuals, counts.values.astype(np.int64))
+    df[_RECENCY_RANK] = _descending_ranks(individuals, last_visits.values.view(np.int64))
+    return df
 
 
+def _select_rank(traj, rank):
+    """
+    Select one of the ranks of the locations of a set of individuals, sorted by rank.
+    
+    Parameters
+    ----------
+    traj : TrajDataFrame
+        the trajectories of the individuals.
+    
+    rank : str
+        the name of the rank column.
+    
+    Returns
+    -------
+    pandas DataFrame
+        the rank for each location of the individuals, indexed by the individual (if any) and the rank starting from 0.
+    """
+    df = ranks(traj)
+    keys = [constants.UID, rank] if constants.UID in traj.columns else [rank]
+    df = df.sort_values(keys)
+    positions = df[rank].values - 1
+    if constants.UID in traj.columns:
+        df.index = pd.MultiIndex.from_arrays([df[constants.UID].values, positions], names=[constants.UID, None])
+    else:
+        df.index = positions
+    return df[[constants.LATITUDE, constants.LONGITUDE, rank]]
+
+
+@_dask_partitions
 def recency_rank(traj, show_progress=True):
     """Recency rank.
     
@@ -1370,7 +1776,7 @@ def recency_rank(traj, show_progress=True):
         the trajectories of the individuals.
     
     show_progress : boolean, optional
-        if True, show a progress bar. The default is True.
+        not used, since the locations of all the individuals are ranked at once. The default is True.
     
     Returns
     -------
@@ -1405,38 +1811,12 @@ def recency_rank(traj, show_progress=True):
     
     See Also
     --------
-    frequency_rank
-    """
-    # if 'uid' column in not present in the TrajDataFrame
-    if constants.UID not in traj.columns:
-        return _recency_rank_individual(traj)
-    
-    if show_progress:
-        df = traj.groupby(constants.UID).progress_apply(lambda x: _recency_rank_individual(x))
-    else:
-        df = traj.groupby(constants.UID).apply(lambda x: _recency_rank_individual(x))
-    return pd.DataFrame(df)
-
-
-def _frequency_rank_individual(traj):
-    """
-    Compute the frequency rank of the locations of a single individual given their TrajDataFrame.
-    
-    Parameters
-    ----------
-    traj : TrajDataFrame
-        the trajectory of the individual.
-    
-    Returns
-    -------
-    pandas DataFrame
-        the frequency rank for each location of the individual.
+    frequency_rank, ranks
     """
-    traj = traj.groupby([constants.LATITUDE, constants.LONGITUDE]).count().sort_values(by=constants.DATETIME, ascending=False).reset_index()
-    traj['frequency_rank'] = range(1, len(traj) + 1)
-    return traj[[constants.LATITUDE, constants.LONGITUDE, 'frequency_rank']]
+    return _select_rank(traj, _RECENCY_RANK)
 
 
+@_dask_partitions
 def frequency_rank(traj, show_progress=True):
     """Frequency rank.
     
@@ -1448,7 +1828,7 @@ def frequency_rank(traj, show_progress=True):
         the trajectories of the individuals.
     
     show_progress : boolean, optional
-        if True, show a progress bar. The default is True.
+        not used, since the locations of all the individuals are ranked at once. The default is True.
     
     Returns
     -------
@@ -1475,14 +1855,6 @@ def frequency_rank(traj, show_progress=True):
 
     See Also
     --------
-    recency_rank
+    recency_rank, ranks
     """
-    # if 'uid' column in not present in the TrajDataFrame
-    if constants.UID not in traj.columns:
-        return _frequency_rank_individual(traj)
-    
-    if show_progress:
-        df = traj.groupby(constants.UID).progress_apply(lambda x: _frequency_rank_individual(x))
-    else:
-        df = traj.groupby(constants.UID).apply(lambda x: _frequency_rank_individual(x))
-    return df
+    return _select_rank(traj, _FREQUENCY_RANK)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from .. import collective
+from ...core.trajectorydataframe import TrajDataFrame
+from ...utils import constants
+
+latitude = constants.LATITUDE
+longitude = constants.LONGITUDE
+date_time = constants.DATETIME
+user_id = constants.UID
+
+locations = np.array([[43.8430139, 10.5079940],
+                      [43.5442700, 10.3261500],
+                      [43.7085300, 10.4036000]])
+
+
+def _trajectories(points):
+    # the points (uid, [lat, lng], datetime) of the individuals, in random order
+    df = pd.DataFrame([(uid, lat, lng, t) for uid, (lat, lng), t in points], columns=[user_id, latitude, longitude, date_time])
+    df[date_time] = pd.to_datetime(df[date_time])
+    return TrajDataFrame(df.sample(frac=1, random_state=0))
+
+
+@pytest.mark.parametrize('self_loops', [False, True])
+def test_origin_destination_matrix(self_loops):
+    a, b, c = locations
+    visits = {1: [a, b, a, b, c], 2: [c, c, a, b, a]}
+    tdf = _trajectories([(uid, location, pd.Timestamp('2011-02-03 08:00') + pd.Timedelta(hours=i))
+                         for uid, uid_visits in visits.items() for i, location in enumerate(uid_visits)])
+    output = collective.origin_destination_matrix(tdf, self_loops=self_loops, show_progress=False)
+
+    # the trips of all the individuals, the edges of each origin in order of first trip
+    edges = [(a, b, 3), (b, a, 2), (b, c, 1)] + ([(c, c, 1)] if self_loops else []) + [(c, a, 1)]
+    assert list(output.columns) == ['lat_origin', 'lng_origin', 'lat_dest', 'lng_dest', 'n_trips']
+    assert np.array_equal(output[['lat_origin', 'lng_origin']].values, [origin for origin, _, _ in edges])
+    assert np.array_equal(output[['lat_dest', 'lng_dest']].values, [dest for _, dest, _ in edges])
+    assert list(output['n_trips']) == [n_trips for _, _, n_trips in edges]
+
+
+@pytest.mark.parametrize('hours, minutes, lat_deltas', [(1, 0, [0.1, 0.2, 0]), (0, 90, [0.3, 0.2, 0])])
+def test_mean_square_displacement(hours, minutes, lat_deltas):
+    # the individuals move along a meridian, so that each displacement is an arc of the earth's circumference
+    points = [(1, [43.0, 10.0], '2011-02-03 08:00'), (1, [43.1, 10.0], '2011-02-03 08:30'), (1, [43.3, 10.0], '2011-02-03 09:30'),
+              (2, [45.0, 10.0], '2011-02-03 08:00'), (2, [44.8, 10.0], '2011-02-03 09:00'),
+              (3, [44.0, 10.0], '2011-02-03 10:00')]
+    output = collective.mean_square_displacement(_trajectories(points), days=0, hours=hours, minutes=minutes, show_progress=False)
+
+    expected = np.mean((6371.0 * np.radians(lat_deltas)) ** 2)
+    assert output == pytest.approx(expected)
@@ -0,0 +1,302 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from .. import individual
+from ...core.trajectorydataframe import TrajDataFrame
+from ...utils import constants, grouping
+from ...utils.gislib import getDistanceByHaversine
+
+latitude = constants.LATITUDE
+longitude = constants.LONGITUDE
+date_time = constants.DATETIME
+user_id = constants.UID
+
+locations = np.array([[43.8430139, 10.5079940],
+                      [43.5442700, 10.3261500],
+                      [43.7085300, 10.4036000],
+                      [43.7792500, 11.2462600],
+                      [45.4642035, 9.1899820]])
+
+
+def _random_trajectories(n_users=20, max_points=40, n_locations=3, seed=0):
+    # visits of each individual to a few locations, at distinct datetimes, in random order
+    rng = np.random.RandomState(seed)
+    rows = []
+    for uid in range(n_users):
+        n = rng.randint(1, max_points)
+        visits = locations[rng.randint(0, n_locations, n)]
+        times = pd.Timestamp('2011-02-03') + pd.to_timedelta(rng.choice(10 ** 6, n, replace=False), unit='s')
+        rows.extend((uid, lat, lng, t) for (lat, lng), t in zip(visits, times))
+    df = pd.DataFrame(rows, columns=[user_id, latitude, longitude, date_time])
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+trajectories = _random_trajectories()
+
+
+def _brute_force_entropy(sequence):
+    # Lempel-Ziv estimator: the length of the shortest substring starting at each position
+    # that does not appear before it
+    def contains(seq, sub):
+        return any(seq[k:k + len(sub)] == sub for k in range(len(seq) - len(sub) + 1))
+
+    n = len(sequence)
+    sum_lambda = 1. + 2.
+    for i in range(1, n - 1):
+        j = 1
+        while contains(sequence[:i], sequence[i:i + j]):
+            j += 1
+            if i + j == n:
+                j += 1
+                break
+        sum_lambda += j
+    return 1. / sum_lambda * n * np.log2(n)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('n_locations', [2, 5])
+def test_real_entropy(seed, n_locations):
+    df = _random_trajectories(n_locations=n_locations, seed=seed)
+    output = individual.real_entropy(TrajDataFrame(df), show_progress=False)
+
+    expected = {}
+    for uid, points in df.sort_values(date_time).groupby(user_id):
+        sequence = list(map(tuple, points[[latitude, longitude]].values))
+        expected[uid] = _brute_force_entropy(sequence) if len(sequence) > 1 else 0.0
+
+    assert list(output[user_id]) == sorted(expected)
+    np.testing.assert_allclose(output['real_entropy'].values, [expected[uid] for uid in output[user_id]])
+
+
+def test_real_entropy_single_individual():
+    df = trajectories[trajectories[user_id] == 3].drop(columns=user_id)
+    output = individual.real_entropy(TrajDataFrame(df), show_progress=False)
+    sequence = list(map(tuple, df.sort_values(date_time)[[latitude, longitude]].values))
+    assert output['real_entropy'][0] == pytest.approx(_brute_force_entropy(sequence))
+
+
+@pytest.mark.parametrize('column', [None, date_time, latitude, longitude])
+def test_precompute_is_reused(column):
+    tdf = TrajDataFrame(trajectories)
+    if column is not None:
+        # missing values do not invalidate the index
+        tdf.loc[0, column] = None
+    index = individual.precompute(tdf)
+    individual.radius_of_gyration(tdf, show_progress=False)
+    individual.random_entropy(tdf, show_progress=False)
+    assert individual.precompute(tdf) is index
+
+
+@pytest.mark.parametrize('column', [user_id, date_time, latitude, longitude])
+def test_precompute_is_invalidated(column):
+    tdf = TrajDataFrame(trajectories)
+    index = individual.precompute(tdf)
+    individual.radius_of_gyration(tdf, show_progress=False)
+
+    # the values of the column are shuffled between the points
+    tdf[column] = tdf[column].sample(frac=1, random_state=1).values
+    assert individual.precompute(tdf) is not index
+
+    expected = TrajDataFrame(pd.DataFrame(tdf))
+    for measure in [individual.radius_of_gyration, individual.waiting_times, individual.number_of_locations]:
+        pd.testing.assert_frame_equal(measure(tdf, show_progress=False), measure(expected, show_progress=False))
+
+
+def test_radius_of_gyration_fast():
+    tdf = TrajDataFrame(trajectories)
+    output = individual.radius_of_gyration(tdf, show_progress=False)
+    fast = individual.radius_of_gyration(tdf, show_progress=False, fast=True)
+    assert np.array_equal(output[user_id].values, fast[user_id].values)
+    np.testing.assert_allclose(fast['radius_of_gyration'].values, output['radius_of_gyration'].values, rtol=1e-4)
+
+
+@pytest.mark.parametrize('measure', [individual.radius_of_gyration, individual.k_radius_of_gyration, individual.random_entropy,
+                                     individual.uncorrelated_entropy, individual.real_entropy, individual.maximum_distance,
+                                     individual.distance_straight_line, individual.location_frequency, individual.jump_lengths,
+                                     individual.max_distance_from_home])
+def test_n_jobs(measure, monkeypatch):
+    # let the small TrajDataFrame be processed in parallel
+    monkeypatch.setattr(grouping, 'MIN_POINTS_PARALLEL', 10)
+    tdf = TrajDataFrame(trajectories)
+    pd.testing.assert_frame_equal(measure(tdf, show_progress=False, n_jobs=2), measure(tdf, show_progress=False, n_jobs=1))
+
+
+def test_ranks():
+    tdf = TrajDataFrame(trajectories)
+    output = individual.ranks(tdf)
+
+    for measure, rank in [(individual.frequency_rank, 'frequency_rank'), (individual.recency_rank, 'recency_rank')]:
+        expected = measure(tdf, show_progress=False)
+        sorted_output = output.sort_values([user_id, rank])
+        assert np.array_equal(sorted_output[user_id].values, expected.index.get_level_values(0))
+        assert np.array_equal(sorted_output[[latitude, longitude, rank]].values, expected.values)
+
+
+def test_ranks_of_an_individual():
+    # location 0 is visited three times, location 1 twice and last, location 2 once
+    visits = [0, 1, 0, 2, 0, 1]
+    df = pd.DataFrame(locations[visits], columns=[latitude, longitude])
+    df[date_time] = pd.date_range('2011-02-03 08:00', periods=len(visits), freq='H')
+    df[user_id] = 1
+    output = individual.ranks(TrajDataFrame(df)).sort_values([latitude, longitude])
+
+    expected = pd.DataFrame(locations[:3], columns=[latitude, longitude])
+    expected['frequency_rank'] = [1, 2, 3]
+    expected['recency_rank'] = [2, 1, 3]
+    expected = expected.sort_values([latitude, longitude])
+    assert np.array_equal(output[['frequency_rank', 'recency_rank']].values, expected[['frequency_rank', 'recency_rank']].values)
+
+
+def test_waiting_times_as_array():
+    tdf = TrajDataFrame(trajectories)
+    as_list = individual.waiting_times(tdf, show_progress=False, merge=True)
+    as_array = individual.waiting_times(tdf, show_progress=False, merge=True, as_array=True)
+    assert isinstance(as_list, list)
+    assert isinstance(as_array, np.ndarray)
+    assert np.array_equal(as_array, np.array(as_list))
+
+
+def _k_radius_of_gyration_expected(lats_lngs, visits):
+    lats_lngs, visits = np.array(lats_lngs), np.array(visits)
+    center_of_mass = visits.dot(lats_lngs) / visits.sum()
+    distances = np.array([getDistanceByHaversine(lat_lng, center_of_mass) for lat_lng in lats_lngs])
+    return np.sqrt(visits.dot(distances ** 2.0) / visits.sum())
+
+
+@pytest.mark.parametrize('uid', [None, 1])
+def test_k_radius_of_gyration_missing_coordinates(uid):
+    # the point with a missing latitude does not take the place of the second location
+    df = pd.DataFrame([[45.0, 9.0], [45.0, 9.0], [np.nan, 9.0], [46.0, 10.0]], columns=[latitude, longitude])
+    df[date_time] = pd.date_range('2011-02-03 08:00', periods=len(df), freq='H')
+    if uid is not None:
+        df[user_id] = uid
+    output = individual.k_radius_of_gyration(TrajDataFrame(df), k=2, show_progress=False)
+    expected = _k_radius_of_gyration_expected([[45.0, 9.0], [46.0, 10.0]], [2, 1])
+    assert output['2k_radius_of_gyration'].values[0] == pytest.approx(expected)
+
+
+def test_k_radius_of_gyration_ties():
+    # the three locations are visited twice each: the two visited first are selected
+    visits = [[45.0, 9.0], [46.0, 9.0], [45.0, 9.0], [50.0, 9.0], [46.0, 9.0], [50.0, 9.0]]
+    df = pd.DataFrame(visits, columns=[latitude, longitude])
+    df[date_time] = pd.date_range('2011-02-03 08:00', periods=len(df), freq='H')
+    df[user_id] = 1
+    output = individual.k_radius_of_gyration(TrajDataFrame(df.sample(frac=1, random_state=0)), k=2, show_progress=False)
+    expected = _k_radius_of_gyration_expected([[45.0, 9.0], [46.0, 9.0]], [2, 2])
+    assert output['2k_radius_of_gyration'].values[0] == pytest.approx(expected)
+
+
+def test_number_of_locations_missing_coordinates():
+    # the point with a missing latitude is not a location
+    df = pd.DataFrame([[45.0, 9.0], [np.nan, 9.0], [46.0, 10.0], [45.0, 9.0]], columns=[latitude, longitude])
+    df[date_time] = pd.date_range('2011-02-03 08:00', periods=len(df), freq='H')
+    output = individual.number_of_locations(TrajDataFrame(df), show_progress=False)
+    assert list(output['number_of_locations']) == [2]
+
+    df[user_id] = 1
+    output = individual.number_of_locations(TrajDataFrame(df), show_progress=False)
+    assert list(output['number_of_locations']) == [2]
+
+
+def _visits(visits_by_uid):
+    # the points of each individual, one hour apart, in random order
+    rows = []
+    for uid, visits in visits_by_uid.items():
+        times = pd.date_range('2011-02-03 08:00', periods=len(visits), freq='H')
+        rows.extend((uid, lat, lng, t) for (lat, lng), t in zip(locations[visits], times))
+    df = pd.DataFrame(rows, columns=[user_id, latitude, longitude, date_time])
+    return TrajDataFrame(df.sample(frac=1, random_state=0))
+
+
+@pytest.mark.parametrize('self_loops', [False, True])
+def test_individual_mobility_network(self_loops):
+    tdf = _visits({1: [0, 1, 0, 1, 2], 2: [2, 2, 0]})
+    output = individual.individual_mobility_network(tdf, self_loops=self_loops, show_progress=False)
+
+    # the edges of each origin in order of first trip, the origins in order of first trip from them
+    edges = [(1, 0, 1, 2), (1, 1, 0, 1), (1, 1, 2, 1)] + ([(2, 2, 2, 1)] if self_loops else []) + [(2, 2, 0, 1)]
+    assert list(output.columns) == [user_id, 'lat_origin', 'lng_origin', 'lat_dest', 'lng_dest', 'n_trips']
+    assert list(output[user_id]) == [uid for uid, _, _, _ in edges]
+    assert np.array_equal(output[['lat_origin', 'lng_origin']].values, locations[[origin for _, origin, _, _ in edges]])
+    assert np.array_equal(output[['lat_dest', 'lng_dest']].values, locations[[dest for _, _, dest, _ in edges]])
+    assert list(output['n_trips']) == [n_trips for _, _, _, n_trips in edges]
+
+
+def test_home_location():
+    a, b, c, d = locations[:4]
+    points = [
+        # location a and b are visited twice at night, a first; c is visited more often, but during the day
+        (1, a, '2011-02-03 23:00'), (1, b, '2011-02-04 01:00'), (1, c, '2011-02-04 12:00'), (1, c, '2011-02-04 13:00'),
+        (1, c, '2011-02-04 14:00'), (1, b, '2011-02-04 23:00'), (1, a, '2011-02-05 02:00'),
+        # never observed at night: the most visited location overall
+        (2, c, '2011-02-03 10:00'), (2, d, '2011-02-03 12:00'), (2, d, '2011-02-03 14:00'),
+        # never observed at night, a tie: the location visited first
+        (3, d, '2011-02-03 10:00'), (3, c, '2011-02-03 12:00'),
+        # no valid location
+        (4, [np.nan, np.nan], '2011-02-03 23:00')]
+    df = pd.DataFrame([(uid, lat, lng, t) for uid, (lat, lng), t in points], columns=[user_id, latitude, longitude, date_time])
+    df[date_time] = pd.to_datetime(df[date_time])
+    output = individual.home_location(TrajDataFrame(df.sample(frac=1, random_state=0)), show_progress=False)
+
+    assert list(output[user_id]) == [1, 2, 3, 4]
+    np.testing.assert_array_equal(output[[latitude, longitude]].values, [a, d, d, [np.nan, np.nan]])
+
+
+@pytest.mark.parametrize('normalize, expected', [(True, [(0.75 + 0.5 + 1) / 3, (0.25 + 0.5) / 2]),
+                                                  (False, [(3 + 2 + 1) / 3, (1 + 2) / 2])])
+def test_location_frequency_as_ranks(normalize, expected):
+    # the first individual visits a location three times out of four, the second two locations twice each,
+    # the third a single location: only the first two individuals have a second most frequent location
+    tdf = _visits({1: [0, 1, 0, 0], 2: [2, 3, 3, 2], 3: [4]})
+    output = individual.location_frequency(tdf, normalize=normalize, as_ranks=True, show_progress=False)
+
+    np.testing.assert_allclose(output, expected)
+
+
+dask_measures = [(individual.radius_of_gyration, {}), (individual.k_radius_of_gyration, {}), (individual.random_entropy, {}),
+                 (individual.uncorrelated_entropy, {}), (individual.real_entropy, {}), (individual.jump_lengths, {}),
+                 (individual.jump_lengths, {'merge': True}), (individual.maximum_distance, {}),
+                 (individual.distance_straight_line, {}), (individual.waiting_times, {}), (individual.waiting_times, {'merge': True}),
+                 (individual.waiting_times, {'merge': True, 'as_array': True}), (individual.number_of_locations, {}),
+                 (individual.home_location, {}), (individual.max_distance_from_home, {}), (individual.number_of_visits, {}),
+                 (individual.individual_mobility_network, {}), (individual.ranks, {}), (individual.recency_rank, {}),
+                 (individual.frequency_rank, {})]
+
+
+def _assert_same_output(output, expected):
+    assert type(output) == type(expected)
+    if isinstance(expected, pd.DataFrame):
+        pd.testing.assert_frame_equal(output, expected)
+    else:
+        np.testing.assert_array_equal(output, expected)
+
+
+@pytest.mark.parametrize('measure,kwargs', dask_measures)
+def test_dask_partitions(measure, kwargs):
+    dd = pytest.importorskip('dask.dataframe')
+    ddf = dd.from_pandas(trajectories.set_index(user_id), npartitions=3)
+    _assert_same_output(measure(ddf, **kwargs), measure(trajectories, **kwargs))
+
+
+@pytest.mark.parametrize('measure,kwargs', dask_measures)
+def test_dask_partitions_empty(measure, kwargs):
+    dd = pytest.importorskip('dask.dataframe')
+    ddf = dd.from_pandas(trajectories.set_index(user_id), npartitions=3)
+    # all the partitions are empty, the divisions are still known
+    ddf = ddf[ddf[latitude] > 90]
+    _assert_same_output(measure(ddf, **kwargs), measure(trajectories.iloc[:0], **kwargs))
+
+
+def test_dask_partitions_without_progress_bars(capfd):
+    dd = pytest.importorskip('dask.dataframe')
+    ddf = dd.from_pandas(trajectories.set_index(user_id), npartitions=3)
+    individual.radius_of_gyration(ddf, True)
+    individual.waiting_times(ddf, show_progress=True)
+    assert capfd.readouterr().err == ''
+
+
+def test_dask_partitions_require_uid_index():
+    dd = pytest.importorskip('dask.dataframe')
+    with pytest.raises(ValueError):
+        individual.radius_of_gyration(dd.from_pandas(trajectories, npartitions=3))
@@ -5,6 +5,7 @@
 
 from math import sin,cos,atan,acos,asin,atan2,sqrt,pi, modf
 import csv
+import numpy as np
 from skmob.utils import constants
 
 # At the equator / on another great circle???
@@ -22,6 +23,10 @@ degreeInKms = kmsPerNauticalMile * 60
 # earth's mean radius = 6,371km
 earthradius = 6371.0
 
+# largest difference of latitude and longitude (in degrees) between two points for which the 
+# equirectangular approximation is used; its relative error is then below 0.01%
+equirectangularMaxDegrees = 1.0
+
 
 def getDistance(loc1, loc2):
     "aliased default algorithm; args are (lat_decimal,lon_decimal) tuples"
@@ -49,6 +54,56 @@ def getDistanceByHaversine(loc1, loc2):
     return km
 
 
+def getDistanceByHaversineArray(locs1, locs2):
+    "Vectorized Haversine formula - give coordinates as numpy arrays of (lat_decimal,lon_decimal) rows"
+
+    locs1 = np.radians(locs1)
+    locs2 = np.radians(locs2)
+    lat1, lon1 = locs1[..., 0], locs1[..., 1]
+    lat2, lon2 = locs2[..., 0], locs2[..., 1]
+
+    # haversine formula
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+    a = np.sin(dlat / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2.0) ** 2
+    c = 2.0 * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+    km = earthradius * c
+    return km
+
+
+def getDistanceByEquirectangularArray(locs1, locs2):
+    "Vectorized equirectangular approximation of the Haversine formula, used for points less than equirectangularMaxDegrees apart - give coordinates as numpy arrays of (lat_decimal,lon_decimal) rows"
+
+    locs1, locs2 = np.broadcast_arrays(locs1, locs2)
+    dlat = locs2[..., 0] - locs1[..., 0]
+    dlon = locs2[..., 1] - locs1[..., 1]
+
+    # projection on the plane tangent at the mean latitude
+    x = np.radians(dlon) * np.cos(np.radians((locs1[..., 0] + locs2[..., 0]) / 2.0))
+    km = earthradius * np.hypot(np.radians(dlat), x)
+
+    far = (np.abs(dlat) > equirectangularMaxDegrees) | (np.abs(dlon) > equirectangularMaxDegrees)
+    if np.any(far):
+        km[far] = getDistanceByHaversineArray(locs1[far], locs2[far])
+    return km
+
+
+def getConsecutiveDistancesByHaversine(locs):
+    "Vectorized Haversine formula between consecutive rows of a numpy array of (lat_decimal,lon_decimal) rows"
+
+    # each point is converted and its cosine computed once, although it appears in two pairs
+    lat, lon = np.radians(locs.T, order='C')
+    cos_lat = np.cos(lat)
+
+    # haversine formula
+    dlon = np.diff(lon)
+    dlat = np.diff(lat)
+    a = np.sin(dlat / 2.0) ** 2 + cos_lat[:-1] * cos_lat[1:] * np.sin(dlon / 2.0) ** 2
+    c = 2.0 * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+    km = earthradius * c
+    return km
+
+
 def DecimalToDMS(decimalvalue):
     "convert a decimal value to degree,minute,second tuple"
     d = modf(decimalvalue)[0]
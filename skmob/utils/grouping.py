@@ -0,0 +1,490 @@
+import numpy as np
+import pandas as pd
+from functools import partial
+from contextlib import contextmanager
+from tqdm import tqdm
+from joblib import Parallel, delayed, effective_n_jobs
+from ..utils import constants
+tqdm.pandas()
+try:
+    import numba
+    _HAS_NUMBA = True
+except ImportError:  # numba is optional: the compiled drivers run on a single thread
+    _HAS_NUMBA = False
+
+# below this number of points, the cost of starting the processes exceeds the gain of running in parallel
+MIN_POINTS_PARALLEL = 100000
+
+
+class TrajectoryIndex(object):
+    """Trajectory index.
+    
+    The points of a TrajDataFrame as NumPy arrays sorted by individual and datetime, together with the boundaries of each individual's slice. 
+    
+    The index is attached to the TrajDataFrame by `precompute`, so that the measures computed on the same TrajDataFrame sort its points only once. The arrays derived from the sorted points (the coordinates in radians and the location identifiers) are computed at their first use and shared as well. The arrays are shared between the measures and must not be modified.
+    
+    Parameters
+    ----------
+    traj : TrajDataFrame
+        the trajectories of the individuals.
+    
+    Attributes
+    ----------
+    uids : numpy array or None
+        the identifiers of the individuals (None if the TrajDataFrame has no 'uid' column, in which case all the points belong to a single individual).
+    
+    lats_lngs : numpy array
+        the sorted (latitude, longitude) pairs.
+    
+    times : numpy array
+        the sorted datetimes.
+    
+    starts, ends : numpy array
+        the start and end positions of the slice of each individual in the sorted arrays.
+    
+    order : numpy array
+        the positions in the TrajDataFrame of the sorted points.
+    """
+    
+    def __init__(self, traj):
+        times = traj[constants.DATETIME].values
+        order = np.argsort(times, kind='mergesort')
+        
+        if constants.UID in traj.columns:
+            uids = traj[constants.UID].values[order]
+            # rows without identifier belong to no individual
+            order, uids = order[pd.notnull(uids)], uids[pd.notnull(uids)]
+            by_uid = np.argsort(uids, kind='mergesort')
+            order, uids = order[by_uid], uids[by_uid]
+            starts = np.flatnonzero(uids[1:] != uids[:-1]) + 1
+            if len(uids) > 0:
+                starts = np.concatenate([[0], starts])
+            uids = uids[starts]
+        else:
+            uids, starts = None, np.array([0])
+        
+        self.uids = uids
+        self.lats_lngs = traj[[constants.LATITUDE, constants.LONGITUDE]].values[order]
+        self.times = times[order]
+        self.starts = starts
+        self.ends = np.append(starts[1:], len(order))[:len(starts)]
+        self.order = order
+        self.n_rows = len(traj)
+        self._radians = None
+        self._location_ids = None
+    
+    @property
+    def radians(self):
+        """
+        tuple: the sorted latitudes and longitudes in radians, as two contiguous arrays.
+        """
+        if self._radians is None:
+            # contiguous columns, so that the compiled kernels read each coordinate with unit stride
+            self._radians = tuple(np.radians(self.lats_lngs.T, order='C'))
+        return self._radians
+    
+    @property
+    def location_ids(self):
+        """
+        numpy array: the int64 identifier of the location of each sorted point, numbered in order of first appearance.
+        """
+        if self._location_ids is None:
+            self._location_ids = encode_locations(self.lats_lngs)
+        return self._location_ids
+    
+    def matches(self, traj):
+        """
+        Check whether the TrajDataFrame still contains the points the index was built from.
+        
+        Parameters
+        ----------
+        traj : TrajDataFrame
+            the trajectories of the individuals.
+        
+        Returns
+        -------
+        boolean
+            True if the index can be used for `traj`.
+        """
+        if len(traj) != self.n_rows or (constants.UID in traj.columns) != (self.uids is not None):
+            return False
+        
+        if self.uids is not None:
+            uids = traj[constants.UID].values
+            if pd.notnull(uids).sum() != len(self.order) or \
+                    not np.array_equal(uids[self.order], np.repeat(self.uids, self.ends - self.starts)):
+                return False
+        return _array_equal(traj[constants.DATETIME].values[self.order], self.times) and \
+            _array_equal(traj[[constants.LATITUDE, constants.LONGITUDE]].values[self.order], self.lats_lngs)
+
+
+def _array_equal(array1, array2):
+    # as np.array_equal, but missing values (NaN or NaT) are equal to each other
+    if array1.shape != array2.shape:
+        return False
+    return bool(((array1 == array2) | (pd.isnull(array1) & pd.isnull(array2))).all())
+
+
+def precompute(traj):
+    """Precompute.
+    
+    Sort the points of a TrajDataFrame by individual and datetime once, and attach the resulting `TrajectoryIndex` to the TrajDataFrame. The measures computed afterwards on the same TrajDataFrame reuse the index, together with the arrays derived from it, unless the points of the TrajDataFrame have changed in the meantime. Calling `precompute` is optional, as the first measure builds the index anyway.
+    
+    Parameters
+    ----------
+    traj : TrajDataFrame
+        the trajectories of the individuals.
+    
+    Returns
+    -------
+    TrajectoryIndex
+        the index of the points of the TrajDataFrame.
+    
+    Examples
+    --------
+    >>> import skmob
+    >>> from skmob.measures.individual import precompute, radius_of_gyration, random_entropy
+    >>> url = "https://snap.stanford.edu/data/loc-brightkite_totalCheckins.txt.gz"
+    >>> df = pd.read_csv(url, sep='\\t', header=0, nrows=100000, 
+                 names=['user', 'check-in_time', 'latitude', 'longitude', 'location id'])
+    >>> tdf = skmob.TrajDataFrame(df, latitude='latitude', longitude='longitude', datetime='check-in_time', user_id='user')
+    >>> index = precompute(tdf)
+    >>> rg_df = radius_of_gyration(tdf) # reuses the sorted points
+    >>> re_df = random_entropy(tdf) # reuses the sorted points
+    """
+    index = getattr(traj, '_group_index', None)
+    if not isinstance(index, TrajectoryIndex) or not index.matches(traj):
+        index = TrajectoryIndex(traj)
+        # bypass the column assignment of pandas
+        object.__setattr__(traj, '_group_index', index)
+    return index
+
+
+def sorted_arrays(traj):
+    """
+    Extract the points of a TrajDataFrame as NumPy arrays sorted by individual and datetime, together with the boundaries of each individual's slice.
+    
+    The arrays are taken from the `TrajectoryIndex` of the TrajDataFrame returned by `precompute`.
+    
+    Parameters
+    ----------
+    traj : TrajDataFrame
+        the trajectories of the individuals.
+    
+    Returns
+    -------
+    tuple
+        the identifiers of the individuals (None if the TrajDataFrame has no 'uid' column, in which case all the points belong to a single individual), the (latitude, longitude) pairs, the datetimes, and the start and end positions of the slice of each individual in the sorted arrays.
+    """
+    index = precompute(traj)
+    return index.uids, index.lats_lngs, index.times, index.starts, index.ends
+
+
+def map_groups(kernel, arrays, starts, ends, show_progress=True, dtype=float, n_jobs=1):
+    """
+    Apply a kernel to the slice of each individual in the arrays returned by `sorted_arrays`.
+    
+    Parameters
+    ----------
+    kernel : function
+        the function computing the measure of a single individual from their slices of `arrays`.
+    
+    arrays : list
+        the arrays sorted by individual.
+    
+    starts, ends : numpy array
+        the start and end positions of the slice of each individual.
+    
+    show_progress : boolean, optional
+        if True, show a progress bar. The default is True.
+    
+    dtype : data-type, optional
+        the type of the values returned by `kernel`, e.g., `(float, 2)` for pairs of floats. The default is float.
+    
+    n_jobs : int, optional
+        the number of processes applying the kernel in parallel, see `map_batches`. The default is 1.
+    
+    Returns
+    -------
+    numpy array
+        the value of the measure for each individual.
+    """
+    if n_jobs != 1 and len(arrays[0]) >= MIN_POINTS_PARALLEL:
+        return map_batches(partial(map_groups, kernel, show_progress=False, dtype=dtype), arrays, starts, ends, 
+                            show_progress=show_progress, n_jobs=n_jobs)
+    
+    values = np.empty(len(starts), dtype=dtype)
+    for i in tqdm(range(len(starts)), disable=not show_progress):
+        start, end = starts[i], ends[i]
+        values[i] = kernel(*[array[start:end] for array in arrays])
+    return values
+
+
+def map_groups_parallel(driver, arrays, starts, ends, show_progress=True, n_jobs=1, args=()):
+    """
+    Apply a compiled driver, computing a measure for a batch of individuals in parallel, to the slices of the arrays returned by `sorted_arrays`.
+    
+    Parameters
+    ----------
+    driver : function
+        the function computing the measure of the individuals from `arrays` and the start and end positions of their slices.
+    
+    arrays : list
+        the arrays sorted by individual.
+    
+    starts, ends : numpy array
+        the start and end positions of the slice of each individual.
+    
+    show_progress : boolean, optional
+        if True, show a progress bar. The individuals are then processed in batches. The default is True.
+    
+    n_jobs : int, optional
+        the number of processes applying the driver in parallel, see `map_batches`, or the number of threads of the driver when numba is installed. TrajDataFrames with fewer than `MIN_POINTS_PARALLEL` points are processed sequentially. The default is 1.
+    
+    args : tuple, optional
+        the additional arguments of the driver, passed after the start and end positions. The default is ().
+    
+    Returns
+    -------
+    numpy array
+        the value(s) of the measure for each individual, one row per individual.
+    """
+    n_threads = n_jobs if _HAS_NUMBA else 1
+    if _HAS_NUMBA or len(arrays[0]) < MIN_POINTS_PARALLEL:
+        n_jobs = 1
+    with numba_threads(n_threads, len(arrays[0])):
+        if not show_progress and n_jobs == 1:
+            return driver(*arrays, starts, ends, *args)
+        return map_batches(lambda batch_arrays, batch_starts, batch_ends: driver(*batch_arrays, batch_starts, batch_ends, *args), 
+                            arrays, starts, ends, show_progress=show_progress, n_jobs=n_jobs)
+
+
+@contextmanager
+def numba_threads(n_jobs, n_points):
+    """
+    Set the number of threads running the compiled drivers, restoring the previous number on exit.
+    
+    Parameters
+    ----------
+    n_jobs : int
+        the number of threads; -1 means using all processors.
+    
+    n_points : int
+        the number of points processed. Below `MIN_POINTS_PARALLEL` points, a single thread is used.
+    """
+    if not _HAS_NUMBA:
+        yield
+        return
+    
+    n_threads = 1 if n_points < MIN_POINTS_PARALLEL else min(effective_n_jobs(n_jobs), numba.config.NUMBA_NUM_THREADS)
+    previous = numba.get_num_threads()
+    numba.set_num_threads(n_threads)
+    try:
+        yield
+    finally:
+        numba.set_num_threads(previous)
+
+
+def map_batches(function, arrays, starts, ends, show_progress=True, n_batches=100, n_jobs=1):
+    """
+    Apply a function computing a measure for a batch of individuals to batches of consecutive individuals in the arrays returned by `sorted_arrays`, possibly in parallel processes.
+    
+    Parameters
+    ----------
+    function : function
+        the function computing the measure of the individuals from their slices of `arrays` and the start and end positions of their slices within them.
+    
+    arrays : list
+        the arrays sorted by individual.
+    
+    starts, ends : numpy array
+        the start and end positions of the slice of each individual.
+    
+    show_progress : boolean, optional
+        if True, show a progress bar, updated after each batch. The default is True.
+    
+    n_batches : int, optional
+        the number of batches in which the individuals are split. The default is 100.
+    
+    n_jobs : int, optional
+        the number of processes applying the function in parallel; -1 means using all processors. The default is 1.
+    
+    Returns
+    -------
+    numpy array
+        the value(s) of the measure for each individual, one row per individual.
+    """
+    if len(starts) == 0:
+        return function(arrays, starts, ends)
+    
+    def _batches():
+        for batch in np.array_split(np.arange(len(starts)), min(n_batches, len(starts))):
+            # each batch only carries the slices of its own individuals
+            low, high = starts[batch[0]], ends[batch[-1]]
+            yield [array[low:high] for array in arrays], starts[batch] - low, ends[batch] - low
+    
+    batches = tqdm(_batches(), total=min(n_batches, len(starts)), disable=not show_progress)
+    if n_jobs == 1:
+        values = [function(*batch) for batch in batches]
+    else:
+        values = Parallel(n_jobs=n_jobs)(delayed(function)(*batch) for batch in batches)
+    return np.concatenate(values)
+
+
+def apply_parallel(traj, function, show_progress=True, n_jobs=1):
+    """
+    Apply a function to the points of each individual in a TrajDataFrame, as `traj.groupby(constants.UID).apply(function)`, possibly in parallel processes.
+    
+    Parameters
+    ----------
+    traj : TrajDataFrame
+        the trajectories of the individuals.
+    
+    function : function
+        the function computing the measure of a single individual from their points.
+    
+    show_progress : boolean, optional
+        if True, show a progress bar, updated after each individual or, in parallel, after each shard of individuals. The default is True.
+    
+    n_jobs : int, optional
+        the number of processes applying the function in parallel; -1 means using all processors. The individuals are split into one shard per process, so that each process receives the points of its individuals at once. TrajDataFrames with fewer than `MIN_POINTS_PARALLEL` points are processed sequentially. The default is 1.
+    
+    Returns
+    -------
+    pandas Series or DataFrame
+        the result of `function` for each individual, indexed by individual.
+    """
+    if n_jobs == 1 or len(traj) < MIN_POINTS_PARALLEL:
+        if show_progress:
+            return traj.groupby(constants.UID).progress_apply(function)
+        return traj.groupby(constants.UID).apply(function)
+    
+    uids = np.sort(traj[constants.UID].dropna().unique())
+    shards = [shard for shard in np.array_split(uids, min(effective_n_jobs(n_jobs), len(uids))) if len(shard) > 0]
+    shards = tqdm(shards, disable=not show_progress)
+    results = Parallel(n_jobs=n_jobs)(delayed(apply_parallel)(traj[traj[constants.UID].isin(shard)], function, show_progress=False) 
+                                      for shard in shards)
+    return pd.concat(results)
+
+
+def split_consecutive(values, starts, ends, show_progress=True):
+    """
+    Split the values computed between each pair of consecutive points in the arrays returned by `sorted_arrays` into the values of each individual.
+    
+    Parameters
+    ----------
+    values : numpy array
+        the values between each point and the next one, one less than the points.
+    
+    starts, ends : numpy array
+        the start and end positions of the slice of each individual.
+    
+    show_progress : boolean, optional
+        if True, show a progress bar. The default is True.
+    
+    Returns
+    -------
+    numpy array
+        the array of the values of each individual, one less than their points.
+    """
+    # padded so that the slice of each individual ends with the (meaningless) value between 
+    # their last point and the first point of the next individual, which is dropped
+    values = np.append(values, np.NaN)
+    return map_groups(lambda x: x[:-1], [values], starts, ends, show_progress=show_progress, dtype=object)
+
+
+def merge_consecutive(values, ends):
+    """
+    Merge the values computed between each pair of consecutive points in the arrays returned by `sorted_arrays` into the values of all the individuals.
+    
+    Parameters
+    ----------
+    values : numpy array
+        the values between each point and the next one, one less than the points.
+    
+    ends : numpy array
+        the end positions of the slice of each individual.
+    
+    Returns
+    -------
+    numpy array
+        the values of all the individuals, without those between the last point of an individual and the first point of the next one.
+    """
+    return np.delete(values, ends[:-1] - 1)
+
+
+def encode_locations(lats_lngs):
+    """
+    Encode each (latitude, longitude) pair as an integer identifier of the location.
+    
+    Parameters
+    ----------
+    lats_lngs : numpy array
+        the (latitude, longitude) pairs.
+    
+    Returns
+    -------
+    numpy array
+        the identifier of the location of each pair, numbered in order of first appearance.
+    """
+    # factorize numbers missing coordinates -1: shift the codes so that they have their own code 0, 
+    # and never share a key with a real location
+    lat_ids, _ = pd.factorize(lats_lngs[:, 0])
+    lng_ids, lng_values = pd.factorize(lats_lngs[:, 1])
+    ids, _ = pd.factorize((lat_ids.astype(np.int64) + 1) * (len(lng_values) + 1) + (lng_ids + 1))
+    return ids.astype(np.int64)
+
+
+def mobility_networks(lats_lngs, starts, ends, self_loops=False, merge=False):
+    """
+    Compute the individual mobility networks of a set of individuals given the arrays returned by `sorted_arrays`.
+    
+    Parameters
+    -----------
+    lats_lngs : numpy array
+        the (latitude, longitude) pairs sorted by individual and datetime.
+    
+    starts, ends : numpy array
+        the start and end positions of the slice of each individual.
+    
+    self_loops : boolean, optional
+        if True adds self loops also. The default is False.
+    
+    merge : boolean, optional
+        if True, merge the networks of all the individuals into a single network, whose edges are attributed to the individual of their first trip. The default is False.
+    
+    Returns
+    -------
+    tuple
+        the position in `starts` of the individual of each edge, and the individual mobility networks, with the edges of each origin in order of first trip and the origins in order of first trip from them.
+    """
+    locations = encode_locations(lats_lngs)
+    n_locations = locations.max() + 1 if len(locations) > 0 else 0
+    
+    # trips between consecutive points of the same individual
+    is_trip = np.ones(max(len(locations) - 1, 0), dtype=bool)
+    is_trip[ends[:-1] - 1] = False
+    if not self_loops:
+        is_trip &= locations[:-1] != locations[1:]
+    trips = np.flatnonzero(is_trip)
+    individuals = np.repeat(np.arange(len(starts)), ends - starts)[trips]
+    
+    # codes numbered in order of first trip, as the keys of a dictionary filled trip after trip
+    origins, _ = pd.factorize(locations[trips] if merge else individuals * n_locations + locations[trips])
+    edges, _ = pd.factorize(origins * n_locations + locations[trips + 1])
+    n_trips = np.bincount(edges)
+    first_trips = np.flatnonzero(np.concatenate([[True], edges[1:] > np.maximum.accumulate(edges)[:-1]])) if len(edges) > 0 else edges
+    
+    # the edges grouped by origin, keeping their order of first trip
+    first_trips = first_trips[np.argsort(origins[first_trips], kind='mergesort')]
+    n_trips, individuals = n_trips[edges[first_trips]], individuals[first_trips]
+    first_trips = trips[first_trips]
+    
+    imn = pd.DataFrame({constants.LATITUDE + '_origin': lats_lngs[first_trips, 0], 
+                        constants.LONGITUDE + '_origin': lats_lngs[first_trips, 1],
+                        constants.LATITUDE + '_dest': lats_lngs[first_trips + 1, 0], 
+                        constants.LONGITUDE + '_dest': lats_lngs[first_trips + 1, 1], 
+                        'n_trips': n_trips}, 
+                       columns=[constants.LATITUDE + '_origin', constants.LONGITUDE + '_origin',
+                                constants.LATITUDE + '_dest', constants.LONGITUDE + '_dest', 'n_trips'])
+    return individuals, imn